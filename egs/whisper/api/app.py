@@ -4,12 +4,36 @@
 # AUTHORS:
 # Sukbong Kwon (Galois)
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 import uvicorn
 
+from saturn2.backend import (
+    shutdown_executor,
+    start_job_queue,
+    stop_job_queue,
+    MetricsMiddleware,
+    UploadLimitMiddleware,
+)
 from api.route import router
+from api.model import config, loader, load_model
 from api.config import APP_NAME, DESCRIPTION, VERSION, COMPANY, CONTACT, APP_SYMBOL
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Answer liveness right away; the model loads in the background. Shared
+    # weights fork the process pool, which must happen before serving starts.
+    share_weights = config.get("executor", {}).get("share_weights", False)
+    loader.start(load_model, background=not share_weights)
+    # Workers for background jobs
+    start_job_queue(**config.get("queue", {}))
+    yield
+    await stop_job_queue()
+    # Wait for running model calls before exit
+    shutdown_executor()
+
+
 # Initialize FastAPI
 app = FastAPI(
     title=APP_NAME,
@@ -22,6 +46,7 @@ app = FastAPI(
     root_path=f"/{APP_SYMBOL}",
     docs_url=f"/docs",
     openapi_url=f"/openapi.json",
+    lifespan=lifespan,
 )
 
 # Include router
@@ -37,6 +62,12 @@ app.add_middleware(
     allow_headers=['*'],
 )
 
+# Refuse oversized requests before their body is transferred
+app.add_middleware(UploadLimitMiddleware, max_bytes=config.get("upload", {}).get("max_bytes", 0))
+
+# Request counts and latency per endpoint (exposed by /metrics)
+app.add_middleware(MetricsMiddleware)
+
 # Run server
 if __name__ == "__main__":
     uvicorn.run(
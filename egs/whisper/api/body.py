@@ -10,5 +10,7 @@ class RequestBody(BaseModel):
     """
     Request body for the VAD API.
     """
-    lang: str = Field(default="ko", description="언어")
+    lang: str = Field(default="ko", description="언어 (auto=자동 감지)")
     task: str = Field(default="transcribe", description="작업=transcribe/번역=translate")
+    model_name: str = Field(default="", description="모델 이름 (tiny/base/small/medium/large/turbo), 비우면 기본 모델")
+    profile: str = Field(default="", description="프로파일러 트레이스 저장 (cprofile/torch), 비우면 사용 안 함")
@@ -4,9 +4,42 @@
 # AUTHORS:
 # Sukbong Kwon (Galois)
 
-from local.transcribe import Whisper
+import yaml
+from typing import Any
 
-model = Whisper.from_config_yaml(
-    config_yaml="conf/config.yaml",
-)
+from saturn2.backend import configure_executor, observe_cache, ModelLoader
 
+CONFIG_YAML = "conf/config.yaml"
+
+config = yaml.safe_load(open(CONFIG_YAML, "r", encoding="utf-8"))
+
+# The model is loaded in the background (see api/app.py); routes get it
+# through `loader.get`, which answers "not ready" until then
+loader = ModelLoader()
+
+
+def load_model(loader: ModelLoader) -> Any:
+    """Import torch/whisper, load the default model and start the executor
+    """
+    loader.progress("importing")
+    from local.registry import ModelRegistry
+
+    # Models are loaded by name on demand (the default model is loaded now)
+    loader.progress(f"loading {config.get('model_name')}")
+    model = ModelRegistry.from_config_yaml(
+        config_yaml=CONFIG_YAML,
+        on_cache_event=observe_cache,
+    )
+
+    # Executor for model calls. Process workers either share the weights loaded
+    # here (forked, copy-on-write) or load their own registry.
+    loader.progress("starting executor")
+    executor = dict(config.get("executor", {}))
+    share_weights = executor.pop("share_weights", False)
+    configure_executor(
+        **executor,
+        model_factory=ModelRegistry.from_config_yaml,
+        factory_args=(CONFIG_YAML,),
+        shared_model=model if share_weights else None,
+    )
+    return model
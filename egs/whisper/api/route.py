@@ -4,7 +4,9 @@
 # AUTHORS:
 # Sukbong Kwon (Galois)
 
+import asyncio
 from pathlib import Path
+from typing import Any, List
 
 from fastapi import (
     APIRouter,
@@ -14,24 +16,38 @@ from fastapi import (
     Body,
     Request,
     Query,
+    WebSocket,
+    WebSocketDisconnect,
 )
 from fastapi.responses import JSONResponse, FileResponse
 
 from saturn2.backend import (
     api_token,
+    ws_api_token,
     run_batch,
     run_batch_uri,
+    run_batch_files,
+    run_batch_uris,
     run_batch_bytes,
+    run_local,
+    check_status,
+    get_status_path,
+    read_status,
+    get_result,
+    get_progress,
+    metrics_response,
 )
+from saturn2.backend.code.code import ERROR_INVALID_ID
 
 # Local
-from .model import model
+from .model import loader, config
 from .config import APP_SYMBOL, VERSION, DESCRIPTION
 from .body import RequestBody
 
 # Define variables
 EXP_FOLDER = Path("exp") / APP_SYMBOL
 EXP_FOLDER.mkdir(parents=True, exist_ok=True)
+UPLOAD = config.get("upload", {})
 
 # Define router
 router = APIRouter(
@@ -62,23 +78,66 @@ async def overview():
         }
     )
 
+@router.get(
+    "/health",
+    summary="생존 확인",
+    description="서버 프로세스가 살아 있는지 확인합니다. 모델 로딩 중에도 응답하며, 로딩 실패 시 503을 반환합니다.",
+    operation_id="health_endpoint",
+)
+async def health():
+    status = loader.status()
+    return JSONResponse(
+        content={"alive": status["state"] != "failed", **status},
+        status_code=503 if status["state"] == "failed" else 200,
+    )
+
+@router.get(
+    "/ready",
+    summary="준비 확인",
+    description="모델 로딩과 워밍업이 끝나 요청을 처리할 수 있는지 확인합니다. 준비 전에는 503을 반환합니다.",
+    operation_id="ready_endpoint",
+)
+async def ready():
+    status = loader.status()
+    return JSONResponse(
+        content={"ready": loader.ready, **status},
+        status_code=200 if loader.ready else 503,
+    )
+
+@router.get(
+    "/metrics",
+    summary="메트릭",
+    description="요청 수/지연, 큐 길이, 처리 중인 작업, 처리한 오디오 길이, 실시간 배율(RTF), 업로드 바이트, 상태별 건수를 Prometheus 형식으로 반환합니다.",
+    operation_id="metrics_endpoint",
+)
+async def metrics():
+    return metrics_response()
+
 @router.post(
     "/run",
     summary="파일 업로드 방식",
-    description="파일 업로드 방식으로 음성 파일을 전송하여 음성 파일을 텍스트로 변환합니다.",
+    description="파일 업로드 방식으로 음성 파일을 전송하여 음성 파일을 텍스트로 변환합니다. 업로드하는 동안 해시 계산, 헤더 검사, 디코딩을 함께 하며, 음성이 아니거나 너무 크거나 긴 파일은 업로드 도중에 거부합니다 (520).",
     operation_id="run_endpoint", dependencies=[Depends(api_token)],
 )
 async def run(
     file: UploadFile = File(..., description="음성 파일을 업로드"),
     content_id: str = Body("", description="콘텐츠 아이디"),
     out_dir: str = Body(str(EXP_FOLDER), description="출력 디렉토리"),
+    background: bool = Query(False, description="백그라운드 처리 (상태 조회로 결과 확인)"),
+    stream: bool = Query(False, description="세그먼트 단위 스트리밍 응답 (NDJSON)"),
     request_body: RequestBody = Depends(),
+    model: Any = Depends(loader.get),
 )-> dict:
     return await run_batch(
         model,
         file,
         content_id,
         out_dir,
+        background=background,
+        stream=stream,
+        ingest=UPLOAD.get("ingest", True),
+        max_bytes=UPLOAD.get("max_bytes", 0),
+        max_duration=UPLOAD.get("max_duration_s", 0),
         **request_body.model_dump(),
     )
 
@@ -93,20 +152,25 @@ async def run_uri(
     uri: str = Body(..., description="저장소에 있는 파일의 URI"),
     content_id: str = Body("", description="콘텐츠 아이디"),
     out_dir: str = Body(str(EXP_FOLDER), description="출력 디렉토리"),
+    background: bool = Query(False, description="백그라운드 처리 (상태 조회로 결과 확인)"),
+    stream: bool = Query(False, description="세그먼트 단위 스트리밍 응답 (NDJSON)"),
     request_body: RequestBody = Depends(),
+    model: Any = Depends(loader.get),
 )-> dict:
     return await run_batch_uri(
         model,
         uri,
         content_id,
         out_dir,
+        background=background,
+        stream=stream,
         **request_body.model_dump(),
     )
 
 @router.post(
     "/bytes",
     summary="Binary 전송 방식",
-    description="Binary 전송 방식으로 음성 파일을 전송하여 음성 파일을 텍스트로 변환합니다.",
+    description="Binary 전송 방식으로 음성 파일을 전송하여 음성 파일을 텍스트로 변환합니다. 파일로 저장하지 않고 메모리에서 디코딩하며(백그라운드 처리는 파일로 저장 후 실행 시 디코딩), audio/pcm(little-endian), audio/L16(big-endian; rate, channels 지정 가능)과 16kHz 16bit WAV는 ffmpeg 없이 바로 변환합니다.",
     operation_id="bytes_endpoint",
     dependencies=[Depends(api_token)],
 )
@@ -115,7 +179,9 @@ async def run_bytes(
     data: bytes = Body(..., description="음성 파일의 바이트 데이터"),
     content_id: str = Query("", description="콘텐츠 아이디"),
     out_dir: str = Query(str(EXP_FOLDER), description="출력 디렉토리"),
+    background: bool = Query(False, description="백그라운드 처리 (상태 조회로 결과 확인)"),
     request_body: RequestBody = Depends(),
+    model: Any = Depends(loader.get),
 )-> dict:
     content_type = request.headers.get("content-type", "")
     return await run_batch_bytes(
@@ -124,10 +190,223 @@ async def run_bytes(
         content_type,
         content_id,
         out_dir,
+        background=background,
+        in_memory=True,
         **request_body.model_dump(),
     )
 
 
+@router.post(
+    "/files",
+    summary="여러 파일 업로드 방식",
+    description="여러 음성 파일을 한 번에 업로드하여 텍스트로 변환합니다. 파일마다 콘텐츠 아이디(<콘텐츠 아이디>-0000, ...)와 상태/결과가 따로 생기며, 진행 현황은 /progress로 조회합니다.",
+    operation_id="files_endpoint",
+    dependencies=[Depends(api_token)],
+)
+async def run_files(
+    files: List[UploadFile] = File(..., description="음성 파일들을 업로드"),
+    content_id: str = Body("", description="작업 콘텐츠 아이디"),
+    out_dir: str = Body(str(EXP_FOLDER), description="출력 디렉토리"),
+    background: bool = Query(False, description="백그라운드 처리 (진행 현황 조회로 확인)"),
+    request_body: RequestBody = Depends(),
+    model: Any = Depends(loader.get),
+)-> dict:
+    return await run_batch_files(
+        model,
+        files,
+        content_id,
+        out_dir,
+        background=background,
+        **request_body.model_dump(),
+    )
+
+@router.post(
+    "/uris",
+    summary="여러 URI 방식",
+    description="저장소에 있는 여러 파일을 한 번에 음성인식합니다. 파일마다 콘텐츠 아이디와 상태/결과가 따로 생기며, 진행 현황은 /progress로 조회합니다.",
+    operation_id="uris_endpoint",
+    dependencies=[Depends(api_token)],
+)
+async def run_uris(
+    uris: List[str] = Body(..., description="저장소에 있는 파일들의 URI"),
+    content_id: str = Body("", description="작업 콘텐츠 아이디"),
+    out_dir: str = Body(str(EXP_FOLDER), description="출력 디렉토리"),
+    background: bool = Query(False, description="백그라운드 처리 (진행 현황 조회로 확인)"),
+    request_body: RequestBody = Depends(),
+    model: Any = Depends(loader.get),
+)-> dict:
+    return await run_batch_uris(
+        model,
+        uris,
+        content_id,
+        out_dir,
+        background=background,
+        **request_body.model_dump(),
+    )
+
+
+@router.post(
+    "/language",
+    summary="언어 감지",
+    description="음성 파일의 첫 발화 30초로 언어를 감지하여 상위 언어와 확률을 반환합니다.",
+    operation_id="language_endpoint",
+    dependencies=[Depends(api_token)],
+)
+async def language(
+    file: UploadFile = File(..., description="음성 파일을 업로드"),
+    content_id: str = Body("", description="콘텐츠 아이디"),
+    out_dir: str = Body(str(EXP_FOLDER), description="출력 디렉토리"),
+    top_k: int = Query(3, description="반환할 언어 개수"),
+    model_name: str = Query("", description="모델 이름, 비우면 기본 모델"),
+    model: Any = Depends(loader.get),
+)-> dict:
+    return await run_batch(
+        model.detect_language,
+        file,
+        content_id,
+        out_dir,
+        top_k=top_k,
+        model_name=model_name,
+    )
+
+
+@router.get(
+    "/models",
+    summary="모델 현황",
+    description="로드된 모델과 모델별 사용/로딩 통계를 조회합니다.",
+    operation_id="models_endpoint",
+    dependencies=[Depends(api_token)],
+)
+async def models(
+    model: Any = Depends(loader.get),
+)-> dict:
+    return model.usage()
+
+
+@router.get(
+    "/status",
+    summary="처리 상태 조회",
+    description="콘텐츠 아이디로 음성인식 처리 상태를 조회합니다.",
+    operation_id="status_endpoint",
+    dependencies=[Depends(api_token)],
+)
+async def status(
+    content_id: str = Query(..., description="콘텐츠 아이디"),
+    out_dir: str = Query(str(EXP_FOLDER), description="출력 디렉토리"),
+)-> dict:
+    try:
+        current, detail = read_status(get_status_path(content_id, out_dir))
+    except Exception as e:
+        return ERROR_INVALID_ID(content={"id": content_id, "detail": str(e)}).asdict()
+    return check_status(content_id, current, detail)
+
+
+@router.get(
+    "/result",
+    summary="처리 결과 조회",
+    description="콘텐츠 아이디로 음성인식 결과를 조회합니다. 처리 중이면 현재 상태를 반환합니다.",
+    operation_id="result_endpoint",
+    dependencies=[Depends(api_token)],
+)
+async def result(
+    content_id: str = Query(..., description="콘텐츠 아이디"),
+    out_dir: str = Query(str(EXP_FOLDER), description="출력 디렉토리"),
+)-> dict:
+    return get_result(content_id, get_status_path(content_id, out_dir))
+
+
+@router.get(
+    "/progress",
+    summary="진행 현황 조회",
+    description="여러 파일 작업의 진행 현황(예: 12/40 done)과 파일별 상태를 조회합니다.",
+    operation_id="progress_endpoint",
+    dependencies=[Depends(api_token)],
+)
+async def progress(
+    content_id: str = Query(..., description="작업 콘텐츠 아이디"),
+    out_dir: str = Query(str(EXP_FOLDER), description="출력 디렉토리"),
+)-> dict:
+    return get_progress(content_id, get_status_path(content_id, out_dir))
+
+
+@router.websocket("/stream")
+async def stream(
+    websocket: WebSocket,
+    lang: str = Query("ko", description="언어"),
+    task: str = Query("transcribe", description="작업=transcribe/번역=translate"),
+    model_name: str = Query("", description="모델 이름, 비우면 기본 모델"),
+):
+    """Live transcription over WebSocket
+
+    The client sends 16 kHz mono 16-bit little-endian PCM as binary messages
+    and the text message "EOF" at the end of the stream. The server sends
+    {"type": "partial", "text": ...} and {"type": "final", "segments": [...]}
+    messages, then {"type": "done"} after the last final segments. Errors
+    are sent as {"type": "error", "message": ...} before the socket closes.
+    """
+    if not await ws_api_token(websocket):
+        return
+    await websocket.accept()
+    if not loader.ready:
+        await websocket.close(code=1013, reason="Server is not ready")
+        return
+
+    from local.langmap import whisper_supported_languages
+    from local.streaming import StreamingSession, pcm16_to_float32
+
+    async def close_with_error(message: str, code: int) -> None:
+        await websocket.send_json({"type": "error", "message": message})
+        await websocket.close(code=code, reason=message[:120])
+
+    if task not in ("transcribe", "translate"):
+        await close_with_error(f"Task {task} is not supported", 1008)
+        return
+    if lang != "auto" and lang not in whisper_supported_languages:
+        await close_with_error(f"Language {lang} is not supported", 1008)
+        return
+    try:
+        whisper_model = await asyncio.to_thread(loader.model.get, model_name)
+    except ValueError as e:
+        await close_with_error(str(e), 1008)
+        return
+    session = StreamingSession(whisper_model, task=task, lang=lang)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+            end = message.get("text") == "EOF"
+            if message.get("bytes"):
+                session.insert_audio(pcm16_to_float32(message["bytes"]))
+                if not session.ready():
+                    continue
+                # The session keeps its buffer in this process; decode under the in-flight limit
+                update = await run_local(session.process)
+            elif end:
+                update = await run_local(session.finish)
+            else:
+                continue
+
+            if update["final"]:
+                await websocket.send_json({"type": "final", "segments": update["final"]})
+            if update["partial"]:
+                await websocket.send_json({"type": "partial", "text": update["partial"]})
+
+            if end:
+                await websocket.send_json({"type": "done"})
+                await websocket.close()
+                return
+    except WebSocketDisconnect:
+        return
+    except Exception as e:
+        try:
+            await close_with_error(f"Stream failed: {e}", 1011)
+        except (WebSocketDisconnect, RuntimeError):
+            # The client is already gone
+            pass
+
+
 @router.get(
     "/download",
     summary="파일 다운로드",
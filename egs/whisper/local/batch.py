@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# Transcribe many files with one model load: inputs, resume and throughput
+
+import asyncio
+import glob
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator
+
+# Saturn2
+from saturn2.utils.logs import get_logger
+from saturn2.backend import configure_executor, shutdown_executor, run_model
+
+# Define
+logger = get_logger(__name__, level="INFO")
+AUDIO_SUFFIXES = {
+    ".wav", ".flac", ".mp3", ".m4a", ".aac", ".ogg", ".opus", ".wma", ".webm", ".mp4", ".mkv", ".mov", ".avi",
+}
+
+
+def collect_media(
+    inputs: Iterable[str],
+    manifest: str = "",
+)-> Iterator[str]:
+    """Audio files of files, directories (searched recursively), globs and a manifest
+
+    Args:
+        inputs (Iterable[str]): Files, directories or glob patterns.
+        manifest (str): File with one audio path per line ('#' starts a comment).
+    Yields:
+        str: Audio file paths, each once.
+    """
+    seen = set()
+
+    def unique(paths: Iterable[str]) -> Iterator[str]:
+        for path in paths:
+            if path not in seen:
+                seen.add(path)
+                yield path
+
+    for item in inputs:
+        if Path(item).is_dir():
+            yield from unique(
+                str(path) for path in sorted(Path(item).rglob("*"))
+                if path.suffix.lower() in AUDIO_SUFFIXES and path.is_file()
+            )
+        elif glob.has_magic(item):
+            yield from unique(sorted(glob.glob(item, recursive=True)))
+        else:
+            yield from unique([item])
+
+    if manifest:
+        with open(manifest, encoding="utf-8") as f:
+            yield from unique(
+                line.split("\t")[0].strip() for line in f
+                if line.strip() and not line.startswith("#")
+            )
+
+
+def media_content_id(path: str) -> str:
+    """Content ID stable across runs: the file stem and a hash of its path"""
+    digest = hashlib.sha1(str(Path(path).resolve()).encode("utf-8")).hexdigest()[:10]
+    return f"{Path(path).stem}-{digest}"
+
+
+def is_done(
+    path: str,
+    out_dir: str,
+    task: str,
+) -> bool:
+    """Whether a previous run already wrote all outputs of the file
+
+    The vtt of the last task is written last, so it marks a finished file.
+    The language folder is matched with a wildcard for lang='auto'.
+    """
+    suffix = ".translate" if task == "all" else ""
+    pattern = f"*/{media_content_id(path)}/{Path(path).stem}{suffix}.vtt"
+    return any(Path(out_dir).glob(pattern))
+
+
+async def transcribe_files(
+    model: Any,
+    paths: Iterable[str],
+    out_dir: str,
+    task: str,
+    lang: str,
+    workers: int = 1,
+    threads_per_worker: int = 0,
+    overwrite: bool = False,
+)-> Dict:
+    """Transcribe every file with the loaded model on `workers` processes
+
+    Workers are forked from this process and share the model weights. Files
+    whose outputs exist are skipped unless `overwrite`.
+
+    Args:
+        model (Whisper): Loaded `local.transcribe.Whisper`.
+        paths (Iterable[str]): Audio files (e.g. from `collect_media`); read lazily.
+        out_dir (str): Output directory.
+        task (str): 'transcribe', 'translate' or 'all'.
+        lang (str): Language code, or 'auto'.
+        workers (int): Worker processes (1 runs in this process).
+        threads_per_worker (int): CPUs per worker (0 to divide all CPUs evenly).
+        overwrite (bool): Transcribe files that already have outputs.
+    Returns:
+        Dict: Counts of done/skipped/failed files, audio seconds and throughput.
+    """
+    configure_executor(
+        kind="process" if workers > 1 else "thread",
+        max_workers=workers,
+        max_inflight=workers,
+        threads_per_worker=threads_per_worker,
+        shared_model=model if workers > 1 else None,
+    )
+
+    pending = iter(paths)
+    stats: Dict[str, Any] = {"done": 0, "skipped": 0, "failed": 0, "audio_seconds": 0.0, "failures": []}
+
+    async def worker() -> None:
+        for path in pending:
+            if not overwrite and is_done(path, out_dir, task):
+                stats["skipped"] += 1
+                continue
+            start = time.time()
+            try:
+                result = await run_model(
+                    model,
+                    path,
+                    content_id=media_content_id(path),
+                    out_dir=out_dir,
+                    task=task,
+                    lang=lang,
+                )
+            except Exception as e:
+                logger.error(f"Failed: {path}: {e}")
+                stats["failed"] += 1
+                stats["failures"].append({"path": path, "error": str(e)})
+                continue
+            duration = result.get("audio_info", {}).get("duration", 0.0)
+            stats["done"] += 1
+            stats["audio_seconds"] += duration
+            logger.info(f"Done [{stats['done']}]: {path} ({duration:.1f}s audio in {time.time() - start:.1f}s)")
+
+    # Two requests per worker keep every worker busy
+    start = time.time()
+    try:
+        await asyncio.gather(*[worker() for _ in range(max(1, workers) * 2)])
+    finally:
+        shutdown_executor()
+    elapsed = time.time() - start
+
+    stats.update({
+        "elapsed": round(elapsed, 3),
+        "audio_seconds": round(stats["audio_seconds"], 3),
+        "files_per_second": round(stats["done"] / elapsed, 4) if elapsed else 0.0,
+        "audio_hours_per_hour": round(stats["audio_seconds"] / elapsed, 3) if elapsed else 0.0,
+    })
+    return stats
+
+
+def print_summary(stats: Dict) -> None:
+    """Aggregate throughput of a batch run"""
+    print(json.dumps({key: value for key, value in stats.items() if key != "failures"}, indent=4))
+    for failure in stats["failures"]:
+        print(f"Failed: {failure['path']}: {failure['error']}")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# Dynamic micro-batching of mel windows across requests
+
+import os
+import queue
+import threading
+import time
+import torch
+import weakref
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from whisper.decoding import DecodingOptions, DecodingResult
+
+# Saturn2
+from saturn2.utils.logs import get_logger
+from saturn2.helper.cpu import limit_threads, thread_limits
+
+# Local
+from local.decoding import decode_batch
+
+# Define
+logger = get_logger(__name__, level="INFO")
+
+
+@dataclass
+class _Item:
+    mel: torch.Tensor
+    options_list: Sequence[DecodingOptions]
+    future: Future = field(default_factory=Future)
+    submitted: float = field(default_factory=time.monotonic)
+    # CPU limits of the submitting executor slot
+    limits: Optional[Tuple[List[int], bool, int]] = field(default_factory=thread_limits)
+
+
+class BatchScheduler:
+    """Collect mel windows from concurrent requests and decode them as one batch
+
+    A batch is closed when it reaches `max_batch_size` windows or when its
+    first window has waited `max_wait_ms`.
+    """
+    def __init__(
+        self,
+        model: Any,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        log_every: int = 100,
+    )-> None:
+        """Start the scheduler thread
+
+        Args:
+            model (whisper.model.Whisper): Whisper model.
+            max_batch_size (int): Maximum number of windows per batch.
+            max_wait_ms (float): Maximum time a window waits for others.
+            log_every (int): Log the stats every N batches (0 to disable).
+        """
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.log_every = log_every
+
+        self._closed = False
+        self._start()
+
+        # Threads do not survive fork: forked workers get their own scheduler thread
+        ref = weakref.ref(self)
+        os.register_at_fork(after_in_child=lambda: (scheduler := ref()) and scheduler._start())
+
+    def _start(self) -> None:
+        self._queue: "queue.Queue[_Item | None]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+        self._batches = 0
+        self._windows = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._sizes: Dict[int, int] = {}
+
+        self._thread = threading.Thread(target=self._loop, name="whisper-batcher", daemon=True)
+        if not self._closed:
+            self._thread.start()
+
+    def decode(
+        self,
+        mel: torch.Tensor,
+        options_list: Sequence[DecodingOptions],
+    )-> List[DecodingResult]:
+        """Decode one window with every options, batched with other requests
+
+        Args:
+            mel (torch.Tensor): Mel window (n_mels, N_FRAMES).
+            options_list (Sequence[DecodingOptions]): Decoding options.
+        Returns:
+            List[DecodingResult]: One result per options.
+        """
+        item = _Item(mel=mel, options_list=tuple(options_list))
+        with self._submit_lock:
+            closed = self._closed
+            if not closed:
+                self._queue.put(item)
+        if closed:
+            return decode_batch(self.model, [mel], [item.options_list])[0]
+        return item.future.result()
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the scheduler thread after the queued windows are decoded
+
+        Windows submitted after close are decoded without batching.
+
+        Args:
+            wait (bool): Wait for the scheduler thread to finish.
+        """
+        with self._submit_lock:
+            self._closed = True
+            self._queue.put(None)
+        if wait:
+            self._thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch size and wait time statistics
+        """
+        with self._lock:
+            return {
+                "batches": self._batches,
+                "windows": self._windows,
+                "mean_batch_size": round(self._windows / self._batches, 3) if self._batches else 0.0,
+                "batch_sizes": dict(sorted(self._sizes.items())),
+                "mean_wait_ms": round(1000 * self._wait_total / self._windows, 3) if self._windows else 0.0,
+                "max_wait_ms": round(1000 * self._wait_max, 3),
+            }
+
+    def _loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch: List[_Item] = [first]
+            deadline = first.submitted + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._run(batch)
+            if stop:
+                return
+
+    def _run(self, batch: List[_Item]) -> None:
+        started = time.monotonic()
+
+        # The submitting slots wait for the batch, so it runs on their CPUs
+        limits = [item.limits for item in batch if item.limits is not None]
+        if limits:
+            cores = sorted({core for item_cores, _, _ in limits for core in item_cores})
+            limit_threads(cores, any(pin for _, pin, _ in limits))
+
+        try:
+            results = decode_batch(
+                self.model,
+                [item.mel for item in batch],
+                [item.options_list for item in batch],
+            )
+            for item, result in zip(batch, results):
+                item.future.set_result(result)
+        except Exception as e:
+            for item in batch:
+                item.future.set_exception(e)
+
+        with self._lock:
+            self._batches += 1
+            self._windows += len(batch)
+            self._sizes[len(batch)] = self._sizes.get(len(batch), 0) + 1
+            for item in batch:
+                wait = started - item.submitted
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+
+        if self.log_every and self._batches % self.log_every == 0:
+            logger.info(f"Batching stats: {self.stats()}")
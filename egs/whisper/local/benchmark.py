@@ -0,0 +1,372 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# Throughput and latency benchmark across model sizes, precisions and concurrency
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import tempfile
+import threading
+import time
+import wave
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+import yaml
+
+# Saturn2
+from saturn2.backend import configure_executor, shutdown_executor, run_model
+from saturn2.helper.cpu import available_cpus
+from saturn2.media.helper.load_audio import load_audio, SAMPLE_RATE
+
+# Local
+from local.transcribe import Whisper
+from local.warmup import synthetic_speech
+
+# Throughput and latency keys compared against a baseline (higher is better: +1)
+REGRESSION_KEYS = {
+    "files_per_second": 1,
+    "audio_hours_per_hour": 1,
+    "latency_p95": -1,
+    "rtf_p50": -1,
+}
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Benchmark throughput and latency of Whisper across models, precisions and concurrency',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument('media', type=str, nargs='*', default=['test/test.flac'],
+                        help='Audio files tiled to every --durations length')
+    parser.add_argument('--manifest', type=str, default='',
+                        help='File with one audio path per line, used as is instead of tiling media')
+    parser.add_argument('--synthetic', action='store_true',
+                        help='Use synthetic speech-like audio instead of media')
+    parser.add_argument('--durations', type=str, default='10,30,120',
+                        help='Comma separated lengths in seconds of the tiled audio')
+    parser.add_argument('--config', type=str, default='conf/config.yaml', help='Path to config file: yaml')
+    parser.add_argument('--models', type=str, default='tiny', help='Comma separated model names')
+    parser.add_argument('--precisions', type=str, default='fp32', help='Comma separated precisions: fp32, int8')
+    parser.add_argument('--concurrency', type=str, default='1,2,4', help='Comma separated concurrent requests')
+    parser.add_argument('--rounds', type=int, default=1, help='Passes over the manifest per measurement')
+    parser.add_argument('--lang', type=str, default='ko', help='Language code')
+    parser.add_argument('-t', '--task', type=str, default='transcribe', help='Task name: transcribe / translate')
+    parser.add_argument('--no-warmup', '--no_warmup', dest='warmup', action='store_false',
+                        help='Measure the first (cold) requests too')
+    parser.add_argument('--baseline', type=str, default='',
+                        help='Previous report to compare with; exits 1 on a regression')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Relative change against the baseline counted as a regression')
+    parser.add_argument('-o', '--output', type=str, default='exp/benchmark/benchmark.json', help='Output json')
+    return parser
+
+
+def split_list(text: str) -> List[str]:
+    return [item.strip() for item in text.split(",") if item.strip()]
+
+
+def write_wav(path: Path, audio: np.ndarray) -> None:
+    """Save 16 kHz mono float32 audio as 16-bit PCM wav"""
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+
+
+def build_manifest(
+    args: argparse.Namespace,
+    audio_dir: Path,
+)-> List[str]:
+    """Audio files of the benchmark: the manifest, or media (or synthetic
+    audio) tiled to every duration and saved as wav"""
+    if args.manifest:
+        lines = Path(args.manifest).read_text(encoding="utf-8").splitlines()
+        return [line.split("\t")[0] for line in lines if line.strip() and not line.startswith("#")]
+
+    sources: Dict[str, np.ndarray] = (
+        {"synthetic": synthetic_speech(30.0)}
+        if args.synthetic
+        else {Path(name).stem: load_audio(name)[0] for name in args.media}
+    )
+    audio_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, audio in sources.items():
+        for duration in split_list(args.durations):
+            samples = int(float(duration) * SAMPLE_RATE)
+            path = audio_dir / f"{name}-{duration}s.wav"
+            if not path.exists():
+                write_wav(path, np.resize(audio, samples))
+            paths.append(str(path))
+    return paths
+
+
+def rss_bytes(pid: int = 0) -> int:
+    """Resident set size of a process, this one by default (0 if it is gone)"""
+    pid = pid or os.getpid()
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def child_pids(pid: int) -> List[int]:
+    pids = []
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        try:
+            pids += [int(child) for child in (task / "children").read_text().split()]
+        except OSError:
+            continue
+    return pids
+
+
+class PeakRss:
+    """Samples the RSS of this process and its workers while running
+
+    Pages shared by forked workers are counted once per process, so the
+    peak is an upper bound with `share_weights`.
+    """
+    def __init__(self, interval: float = 0.05) -> None:
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> None:
+        pid = os.getpid()
+        total = rss_bytes(pid) + sum(rss_bytes(child) for child in child_pids(pid))
+        self.peak = max(self.peak, total)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self) -> "PeakRss":
+        self.sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()  # type: ignore
+        self.sample()
+
+
+def load_model(
+    config: str,
+    model_name: str,
+    precision: str,
+    **overrides,
+)-> Tuple[Whisper, float]:
+    """Load a model for measuring, without the result cache and warm-up
+
+    Args:
+        config (str): Path to config file: yaml.
+        model_name (str): Model name of whisper.
+        precision (str): fp32 or int8.
+        **overrides: Other config entries to override.
+    Returns:
+        Tuple[Whisper, float]: The model and its load time in seconds.
+    """
+    start = time.perf_counter()
+    model = Whisper.from_config_yaml(
+        config,
+        model_name=model_name,
+        precision=precision,
+        **{"cache": {}, "warmup": {}, **overrides},
+    )
+    return model, time.perf_counter() - start
+
+
+def percentile(values: List[float], q: float) -> float:
+    return round(float(np.percentile(values, q)), 4) if values else 0.0
+
+
+async def measure(
+    model: Whisper,
+    paths: List[str],
+    concurrency: int,
+    args: argparse.Namespace,
+    out_dir: str,
+)-> Dict:
+    """Send every file (args.rounds times) with `concurrency` requests in flight"""
+    # Every request gets its own content ID, so concurrent outputs do not collide
+    queue: asyncio.Queue = asyncio.Queue()
+    for index, path in enumerate(paths * max(1, args.rounds)):
+        queue.put_nowait((index, path))
+
+    requests: List[Tuple[float, float, Dict]] = []
+
+    async def client() -> None:
+        while not queue.empty():
+            index, path = queue.get_nowait()
+            start = time.perf_counter()
+            result = await run_model(
+                model,
+                path,
+                content_id=f"benchmark-{index}",
+                out_dir=out_dir,
+                task=args.task,
+                lang=args.lang,
+            )
+            latency = time.perf_counter() - start
+            requests.append((latency, result.get("audio_info", {}).get("duration", 0.0), result.get("timing", {})))
+
+    with PeakRss() as rss:
+        start = time.perf_counter()
+        await asyncio.gather(*[client() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _, _ in requests]
+    rtfs = [latency / duration for latency, duration, _ in requests if duration]
+    audio_seconds = sum(duration for _, duration, _ in requests)
+
+    # Mean wall seconds per request of every model stage
+    stages: Dict[str, float] = {}
+    for _, _, timing in requests:
+        for name, stage in timing.get("stages", {}).items():
+            stages[name] = stages.get(name, 0.0) + stage["wall"] / len(requests)
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(requests),
+        "elapsed": round(elapsed, 3),
+        "audio_seconds": round(audio_seconds, 3),
+        "files_per_second": round(len(requests) / elapsed, 4),
+        "audio_hours_per_hour": round(audio_seconds / elapsed, 3),
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+        "rtf_p50": percentile(rtfs, 50),
+        "rtf_mean": round(float(np.mean(rtfs)), 4) if rtfs else 0.0,
+        "peak_rss_bytes": rss.peak,
+        "stages": {name: round(seconds, 4) for name, seconds in stages.items()},
+    }
+
+
+async def benchmark(
+    args: argparse.Namespace,
+    paths: List[str],
+    out_dir: str,
+)-> List[Dict]:
+    """Every model x precision x concurrency measurement"""
+    config = yaml.safe_load(open(args.config, "r", encoding="utf-8"))
+    executor = dict(config.get("executor", {}))
+    kind = executor.get("kind", "thread")
+
+    runs = []
+    for model_name in split_list(args.models):
+        for precision in split_list(args.precisions):
+            model, load_time = load_model(args.config, model_name, precision)
+
+            for concurrency in (int(value) for value in split_list(args.concurrency)):
+                # Process workers are forked with this model (the config's
+                # factory would load the default model instead)
+                configure_executor(
+                    kind=kind,
+                    max_workers=concurrency,
+                    max_inflight=concurrency,
+                    threads_per_worker=executor.get("threads_per_worker", 0),
+                    pin_cores=executor.get("pin_cores", False),
+                    shared_model=model if kind == "process" else None,
+                )
+                if args.warmup:
+                    await measure(model, paths[:1], concurrency, args, out_dir)
+                run = await measure(model, paths, concurrency, args, out_dir)
+                shutdown_executor()
+
+                runs.append({
+                    "model_name": model_name,
+                    "precision": precision,
+                    "device": model.device,
+                    "load_time": round(load_time, 3),
+                    **run,
+                })
+                print(json.dumps({key: value for key, value in runs[-1].items() if key != "stages"}))
+            del model
+    return runs
+
+
+def run_key(run: Dict) -> Tuple:
+    return run["model_name"], run["precision"], run["concurrency"]
+
+
+def compare(
+    runs: List[Dict],
+    baseline: Dict,
+    tolerance: float,
+)-> List[Dict]:
+    """Measurements that got worse than the baseline by more than the tolerance"""
+    previous = {run_key(run): run for run in baseline.get("runs", [])}
+    regressions = []
+    for run in runs:
+        before = previous.get(run_key(run))
+        if before is None:
+            continue
+        for key, sign in REGRESSION_KEYS.items():
+            if not before.get(key):
+                continue
+            change = (run[key] - before[key]) / before[key]
+            if sign * change < -tolerance:
+                regressions.append({
+                    "model_name": run["model_name"],
+                    "precision": run["precision"],
+                    "concurrency": run["concurrency"],
+                    "metric": key,
+                    "baseline": before[key],
+                    "current": run[key],
+                    "change": round(change, 4),
+                })
+    return regressions
+
+
+def main():
+    args = get_parser().parse_args()
+    paths = build_manifest(args, Path(args.output).parent / "audio")
+
+    with tempfile.TemporaryDirectory(prefix="whisper-benchmark-") as out_dir:
+        runs = asyncio.run(benchmark(args, paths, out_dir))
+
+    report = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "cpus": len(available_cpus()),
+        "torch": torch.__version__,
+        "config": args.config,
+        "task": args.task,
+        "lang": args.lang,
+        "rounds": args.rounds,
+        "manifest": paths,
+        "runs": runs,
+    }
+
+    status = 0
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        report["baseline"] = args.baseline
+        report["regressions"] = compare(runs, baseline, args.tolerance)
+        status = 1 if report["regressions"] else 0
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(report, indent=4, ensure_ascii=False), encoding="utf-8")
+    print(json.dumps(report, indent=4, ensure_ascii=False))
+    for regression in report.get("regressions", []):
+        print(f"Regression: {json.dumps(regression)}")
+    raise SystemExit(status)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# Converted checkpoints that later starts memory-map instead of deserializing
+
+import json
+import uuid
+import hashlib
+import torch
+import whisper
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict
+
+from torch import nn
+from whisper.model import AudioEncoder, ModelDimensions, TextDecoder
+
+# Saturn2
+from saturn2.utils.logs import get_logger
+
+# Define
+logger = get_logger(__name__, level="INFO")
+
+
+def source_fingerprint(model_path: str) -> Dict:
+    """What a converted checkpoint depends on: its source and the libraries
+
+    Official models are identified by the SHA-256 in their download URL,
+    checkpoint files by their resolved path, size and modification time.
+
+    Args:
+        model_path (str): Model name or checkpoint path given to `whisper.load_model`.
+    Returns:
+        Dict: Fingerprint of the source checkpoint and the torch/whisper versions.
+    """
+    if model_path in whisper._MODELS:
+        source: Dict = {"url": whisper._MODELS[model_path]}
+    else:
+        path = Path(model_path).resolve()
+        stat = path.stat()
+        source = {"path": str(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    return {**source, "torch": torch.__version__, "whisper": whisper.__version__}
+
+
+def cache_path(
+    cache_dir: str,
+    model_name: str,
+    model_path: str,
+    kind: str,
+)-> Path:
+    """Cache file of a converted model, keyed by the fingerprint of its source
+
+    A changed model_root, a fine-tuned checkpoint reusing a name or a
+    library upgrade gives another file, so stale weights are never mapped.
+
+    Args:
+        cache_dir (str): Directory of converted checkpoints.
+        model_name (str): Model name (readable part of the file name).
+        model_path (str): Model name or checkpoint path given to `whisper.load_model`.
+        kind (str): Conversion, e.g. 'fp32' or 'int8'.
+    Returns:
+        Path: <cache_dir>/<model_name>-<kind>-<fingerprint hash>.pt
+    """
+    fingerprint = json.dumps(source_fingerprint(model_path), sort_keys=True)
+    digest = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:16]
+    return Path(cache_dir) / f"{Path(model_name).name}-{kind}-{digest}.pt"
+
+
+def save_checkpoint(model: whisper.model.Whisper, path: Path) -> None:
+    """Save the weights, dimensions and non-persistent buffers of a model
+
+    Non-persistent buffers (the causal mask and the alignment heads set by
+    `whisper.load_model`) are not in the state dict, so they are saved too.
+
+    Args:
+        model (whisper.model.Whisper): Model ready to run.
+        path (Path): Checkpoint file.
+    """
+    state = model.state_dict()
+    buffers = {
+        name: buffer.to_dense() if buffer.is_sparse else buffer
+        for name, buffer in model.named_buffers()
+        if name not in state
+    }
+    sparse = [name for name, buffer in model.named_buffers() if buffer.is_sparse]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{uuid.uuid4().hex}.tmp")
+    torch.save({
+        "dims": asdict(model.dims),
+        "model_state_dict": state,
+        "buffers": buffers,
+        "sparse": sparse,
+    }, tmp)
+    tmp.rename(path)
+
+
+def empty_model(dims: ModelDimensions) -> whisper.model.Whisper:
+    """Whisper model whose encoder and decoder are on the meta device
+
+    Same modules as `whisper.model.Whisper.__init__`, which cannot run on the
+    meta device (it makes the alignment heads sparse). Nothing is allocated
+    or initialized; the buffers of the top module are left to the caller.
+    """
+    model = whisper.model.Whisper.__new__(whisper.model.Whisper)
+    nn.Module.__init__(model)
+    model.dims = dims
+    with torch.device("meta"):
+        model.encoder = AudioEncoder(
+            dims.n_mels, dims.n_audio_ctx, dims.n_audio_state, dims.n_audio_head, dims.n_audio_layer,
+        )
+        model.decoder = TextDecoder(
+            dims.n_vocab, dims.n_text_ctx, dims.n_text_state, dims.n_text_head, dims.n_text_layer,
+        )
+    return model
+
+
+def load_checkpoint(path: Path) -> whisper.model.Whisper:
+    """Map a checkpoint saved by `save_checkpoint` into a model
+
+    The tensors stay backed by the file: pages are read on first use and
+    shared through the page cache by every process mapping the same file.
+
+    Args:
+        path (Path): Checkpoint file.
+    Returns:
+        whisper.model.Whisper: Model on CPU.
+    """
+    checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+
+    # Build without allocating weights, then adopt the mapped tensors
+    model = empty_model(ModelDimensions(**checkpoint["dims"]))
+    model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+    for name, buffer in checkpoint["buffers"].items():
+        module_name, _, buffer_name = name.rpartition(".")
+        if name in checkpoint["sparse"]:
+            buffer = buffer.to_sparse()
+        model.get_submodule(module_name).register_buffer(buffer_name, buffer, persistent=False)
+    return model
+
+
+def load_converted(
+    load_model: Callable[[], whisper.model.Whisper],
+    model_name: str,
+    cache_dir: str = "",
+    model_path: str = "",
+)-> whisper.model.Whisper:
+    """Map the converted checkpoint cached on disk, or load, convert and cache it
+
+    Args:
+        load_model (Callable): Loads the original checkpoint, converted to FP32 on CPU.
+        model_name (str): Model name, used in the cache file name.
+        cache_dir (str): Directory of converted checkpoints ("" to disable).
+        model_path (str): Source checkpoint (name or path) keying the cache; defaults to model_name.
+    Returns:
+        whisper.model.Whisper: FP32 model on CPU.
+    """
+    path = cache_path(cache_dir, model_name, model_path or model_name, "fp32") if cache_dir else None
+    if path is not None and path.is_file():
+        try:
+            model = load_checkpoint(path)
+            logger.info(f"Converted checkpoint mapped: {path}")
+            return model
+        except Exception as e:
+            # e.g. a truncated file
+            logger.warning(f"Rebuilding converted checkpoint {path}: {e}")
+
+    model = load_model()
+    if path is not None:
+        save_checkpoint(model, path)
+        logger.info(f"Converted checkpoint saved: {path}")
+    return model
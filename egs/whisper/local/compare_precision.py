@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# Compare int8 against fp32: latency, memory and transcript drift
+
+import argparse
+import json
+import time
+import numpy as np
+from pathlib import Path
+from typing import Dict, List
+
+# Saturn2
+from saturn2.media.helper.load_audio import load_audio, SAMPLE_RATE
+
+# Local
+from local.registry import model_bytes
+from local.benchmark import load_model, rss_bytes
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Compare int8 against fp32 whisper inference on CPU',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        'media',
+        type=str,
+        nargs='*',
+        default=['test/test.flac'],
+        help='Audio files of the test corpus'
+    )
+    parser.add_argument('--config', type=str, default='conf/config.yaml', help='Path to config file: yaml')
+    parser.add_argument('-m', '--model-name', '--model_name', dest='model_name', type=str, default='tiny',
+                        help='Model name of whisper')
+    parser.add_argument('--lang', type=str, default='ko', help='Language code')
+    parser.add_argument('-t', '--task', type=str, default='transcribe', help='Task name: transcribe / translate')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per file (the median is reported)')
+    parser.add_argument('-o', '--output', type=str, default='exp/benchmark/precision.json', help='Output json')
+    return parser
+
+
+def edit_distance(ref: str, hyp: str) -> int:
+    """Levenshtein distance between two strings"""
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1]
+
+
+def run_precision(
+    args: argparse.Namespace,
+    precision: str,
+    corpus: Dict[str, np.ndarray],
+)-> Dict:
+    """Load the model at one precision and decode every file"""
+    rss = rss_bytes()
+    model, load_time = load_model(
+        args.config,
+        args.model_name,
+        precision,
+        nocuda=True,
+        batching={},
+        vad={},
+    )
+
+    files = {}
+    for name, audio in corpus.items():
+        latencies = []
+        for _ in range(max(1, args.repeat)):
+            start = time.time()
+            result = model.decode(audio, args.task, args.lang)
+            latencies.append(time.time() - start)
+        duration = len(audio) / SAMPLE_RATE
+        files[name] = {
+            "duration": round(duration, 3),
+            "latency": round(float(np.median(latencies)), 4),
+            "rtf": round(float(np.median(latencies)) / duration, 4),
+            "text": result["text"].strip(),
+        }
+
+    return {
+        "load_time": round(load_time, 3),
+        "weight_bytes": model_bytes(model),
+        "rss_delta_bytes": rss_bytes() - rss,
+        "latency": round(sum(f["latency"] for f in files.values()), 4),
+        "files": files,
+    }
+
+
+def main():
+    args = get_parser().parse_args()
+    corpus = {name: load_audio(name)[0] for name in args.media}
+
+    report: Dict = {
+        "model_name": args.model_name,
+        "task": args.task,
+        "lang": args.lang,
+        "repeat": args.repeat,
+    }
+    for precision in ("fp32", "int8"):
+        report[precision] = run_precision(args, precision, corpus)
+
+    # Drift of the int8 transcripts from the fp32 ones (character error rate)
+    errors: List[int] = []
+    chars: List[int] = []
+    for name, fp32 in report["fp32"]["files"].items():
+        int8 = report["int8"]["files"][name]
+        distance = edit_distance(fp32["text"], int8["text"])
+        int8["cer_vs_fp32"] = round(distance / max(1, len(fp32["text"])), 4)
+        errors.append(distance)
+        chars.append(len(fp32["text"]))
+
+    report["speedup"] = round(report["fp32"]["latency"] / max(report["int8"]["latency"], 1e-9), 3)
+    report["weight_ratio"] = round(report["int8"]["weight_bytes"] / report["fp32"]["weight_bytes"], 3)
+    report["cer_vs_fp32"] = round(sum(errors) / max(1, sum(chars)), 4)
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(report, indent=4, ensure_ascii=False), encoding="utf-8")
+    print(json.dumps(report, indent=4, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
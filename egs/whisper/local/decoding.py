@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# Decoding on 30-second mel windows
+
+import threading
+from dataclasses import replace
+import numpy as np
+import torch
+import whisper
+from whisper.audio import (
+    N_FRAMES,
+    N_SAMPLES,
+    HOP_LENGTH,
+    SAMPLE_RATE,
+    log_mel_spectrogram,
+    pad_or_trim,
+)
+from whisper.decoding import DecodingOptions, DecodingResult
+from whisper.model import MultiHeadAttention
+from whisper.tokenizer import Tokenizer, get_tokenizer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Saturn2
+from saturn2.helper.timing import stage
+
+# Define
+FRAMES_PER_SECOND = SAMPLE_RATE // HOP_LENGTH  # mel frames per second
+TIME_PRECISION = 0.02                           # seconds per timestamp token
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+COMPRESSION_RATIO_THRESHOLD = 2.4
+# Temperatures tried in turn, as whisper.transcribe (temperature_increment_on_fallback=0.2)
+FALLBACK_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+DecodeFn = Callable[[torch.Tensor, Sequence[DecodingOptions]], List[DecodingResult]]
+
+
+def compute_mel(
+    model: Any,
+    audio: np.ndarray,
+)-> torch.Tensor:
+    """Log-mel spectrogram of the whole audio, padded with one window of silence
+
+    Args:
+        model (whisper.model.Whisper): Whisper model.
+        audio (np.ndarray): 16 kHz mono float32 audio.
+    Returns:
+        torch.Tensor: (n_mels, n_frames + N_FRAMES)
+    """
+    with stage("mel"):
+        return log_mel_spectrogram(
+            audio,
+            model.dims.n_mels,
+            padding=N_SAMPLES,
+        ).to(model.device)
+
+
+def thread_safe_kv_cache(model: Any) -> None:
+    """Let several threads decode with the same model at once
+
+    Whisper keeps the key/value cache of a decode in forward hooks on the
+    shared attention modules, so every running decode appends to the caches
+    of all others. The hooks installed by this model then only act on the
+    forward passes of the thread that installed them.
+
+    Args:
+        model (whisper.model.Whisper): Whisper model (patched in place).
+    """
+    def install_kv_cache_hooks(cache: Optional[dict] = None) -> Tuple[dict, list]:
+        # Same as whisper.model.Whisper.install_kv_cache_hooks, for the calling thread only
+        cache = {**cache} if cache is not None else {}
+        owner = threading.get_ident()
+
+        def save_to_cache(module: torch.nn.Module, _: Any, output: torch.Tensor) -> Optional[torch.Tensor]:
+            if threading.get_ident() != owner:
+                return None
+            if module not in cache or output.shape[1] > model.dims.n_text_ctx:
+                cache[module] = output
+            else:
+                cache[module] = torch.cat([cache[module], output], dim=1).detach()
+            return cache[module]
+
+        hooks = []
+        for layer in model.decoder.modules():
+            if isinstance(layer, MultiHeadAttention):
+                hooks.append(layer.key.register_forward_hook(save_to_cache))
+                hooks.append(layer.value.register_forward_hook(save_to_cache))
+        return cache, hooks
+
+    model.install_kv_cache_hooks = install_kv_cache_hooks
+
+
+def decode_batch(
+    model: Any,
+    mels: Sequence[torch.Tensor],
+    options_lists: Sequence[Sequence[DecodingOptions]],
+)-> List[List[DecodingResult]]:
+    """Encode every window once and decode it with each of its options
+
+    Windows are encoded in one batch. Windows sharing the same options are
+    decoded together in one batch.
+
+    Args:
+        model (whisper.model.Whisper): Whisper model.
+        mels (Sequence[torch.Tensor]): Mel windows, each (n_mels, N_FRAMES).
+        options_lists (Sequence[Sequence[DecodingOptions]]): Options per window.
+    Returns:
+        List[List[DecodingResult]]: Results per window, in the order of its options.
+    """
+    fp16 = any(options.fp16 for options in options_lists[0])
+    dtype = torch.float16 if fp16 else torch.float32
+
+    with torch.no_grad():
+        features = model.embed_audio(torch.stack(list(mels)).to(model.device, dtype))
+
+    # Group (window, option) pairs by options
+    groups: Dict[str, Tuple[DecodingOptions, List[Tuple[int, int]]]] = {}
+    for i, options_list in enumerate(options_lists):
+        for j, options in enumerate(options_list):
+            groups.setdefault(repr(options), (options, []))[1].append((i, j))
+
+    results: List[List[Any]] = [[None] * len(options_list) for options_list in options_lists]
+    for options, members in groups.values():
+        decoded = whisper.decode(model, features[[i for i, _ in members]], options)  # type: ignore
+        for (i, j), result in zip(members, decoded):
+            results[i][j] = result
+
+    return results
+
+
+def needs_fallback(result: DecodingResult) -> bool:
+    """Whether a window should be decoded again at a higher temperature
+
+    Same rule as whisper.transcribe: too repetitive (compression ratio) or
+    too unlikely (average log probability) text, except for silence.
+    """
+    if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+        return False
+    return result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD
+
+
+def decode_with_fallback(
+    decode_fn: DecodeFn,
+    window: torch.Tensor,
+    options_list: Sequence[DecodingOptions],
+    temperatures: Sequence[float] = FALLBACK_TEMPERATURES,
+)-> List[DecodingResult]:
+    """Decode a window with every options, retrying failed results at the next temperatures
+
+    Only the options whose result needs a fallback are decoded again, and
+    the retries go through `decode_fn` too (e.g. the batch scheduler). The
+    last result is kept when every temperature fails, like whisper.transcribe.
+
+    Args:
+        decode_fn (DecodeFn): Decodes one window with a list of options.
+        window (torch.Tensor): Mel window (n_mels, N_FRAMES).
+        options_list (Sequence[DecodingOptions]): Decoding options (first temperature pass).
+        temperatures (Sequence[float]): Temperature schedule; the first is the options' own.
+    Returns:
+        List[DecodingResult]: One result per options.
+    """
+    results = list(decode_fn(window, options_list))
+    for temperature in temperatures[1:]:
+        retry = [k for k, result in enumerate(results) if needs_fallback(result)]
+        if not retry:
+            break
+        # Sampling: beam search options do not apply above temperature 0
+        retried = decode_fn(window, [
+            replace(options_list[k], temperature=temperature, beam_size=None, patience=None)
+            for k in retry
+        ])
+        for k, result in zip(retry, retried):
+            results[k] = result
+    return results
+
+
+def tokens_to_segments(
+    tokenizer: Tokenizer,
+    result: DecodingResult,
+    offset: float,
+    window_end: float,
+)-> Tuple[List[Dict], bool]:
+    """Split decoded tokens into segments using the timestamp tokens
+
+    Args:
+        tokenizer (Tokenizer): Whisper tokenizer.
+        result (DecodingResult): Decoding result of one window.
+        offset (float): Start time of the window in seconds.
+        window_end (float): End time of the audio in the window in seconds.
+    Returns:
+        Tuple[List[Dict], bool]: Segments, and whether the last segment
+        was closed by a timestamp token.
+    """
+    segments: List[Dict] = []
+    start: Optional[float] = None
+    text_tokens: List[int] = []
+
+    def add(end: float) -> None:
+        text = tokenizer.decode(text_tokens)
+        if text.strip():
+            segments.append({
+                "start": round(min(offset + (start or 0.0), window_end), 3),
+                "end": round(min(offset + end, window_end), 3),
+                "text": text,
+                "tokens": list(text_tokens),
+                "avg_logprob": result.avg_logprob,
+                "no_speech_prob": result.no_speech_prob,
+            })
+
+    for token in result.tokens:
+        if token >= tokenizer.timestamp_begin:
+            time = (token - tokenizer.timestamp_begin) * TIME_PRECISION
+            if start is not None and text_tokens:
+                add(time)
+                start, text_tokens = None, []
+            else:
+                start = time
+        elif token < tokenizer.eot:
+            text_tokens.append(token)
+
+    complete = not text_tokens
+    if text_tokens:
+        add(window_end - offset)
+
+    return segments, complete
+
+
+def transcribe_windows(
+    model: Any,
+    audio: np.ndarray,
+    options_list: Sequence[DecodingOptions],
+    decode_fn: Optional[DecodeFn] = None,
+    on_segment: Optional[Callable[[int, Dict], None]] = None,
+    mel: Optional[torch.Tensor] = None,
+    temperatures: Sequence[float] = FALLBACK_TEMPERATURES,
+)-> List[Dict]:
+    """Transcribe audio window by window, decoding each window with every options
+
+    Each window is encoded once and decoded once per options; results that
+    look like hallucinations or repetition loops are decoded again at the
+    next temperatures (see `decode_with_fallback`). The first options drive
+    the seek: when its last segment is cut by the window boundary, the next
+    window starts at that segment. Previous text is not used as a prompt,
+    so windows of different requests can be batched.
+
+    Args:
+        model (whisper.model.Whisper): Whisper model.
+        audio (np.ndarray): 16 kHz mono float32 audio.
+        options_list (Sequence[DecodingOptions]): Decoding options, e.g. one per task.
+        decode_fn (DecodeFn, optional): Decodes one window with options_list.
+            Defaults to `decode_batch` with a batch of one.
+        on_segment (Callable, optional): Called with (options index, segment)
+            as soon as a segment is final.
+        mel (torch.Tensor, optional): Precomputed output of `compute_mel`.
+        temperatures (Sequence[float]): Temperature fallback schedule ((0.0,) to disable).
+    Returns:
+        List[Dict]: Whisper style results ({text, segments, language}) per options.
+    """
+    if decode_fn is None:
+        decode_fn = lambda window, options: decode_batch(model, [window], [options])[0]
+
+    if mel is None:
+        mel = compute_mel(model, audio)
+    content_frames = mel.shape[-1] - N_FRAMES
+    tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages)
+
+    outputs: List[Dict] = [
+        {"text": "", "segments": [], "language": options.language}
+        for options in options_list
+    ]
+
+    seek = 0
+    while seek < content_frames:
+        offset = seek / FRAMES_PER_SECOND
+        size = min(N_FRAMES, content_frames - seek)
+        window_end = (seek + size) / FRAMES_PER_SECOND
+        window = pad_or_trim(mel[:, seek:seek + size], N_FRAMES)
+
+        results = decode_with_fallback(decode_fn, window, options_list, temperatures)
+
+        # Skip silent windows
+        first = results[0]
+        if first.no_speech_prob > NO_SPEECH_THRESHOLD and first.avg_logprob < LOGPROB_THRESHOLD:
+            seek += size
+            continue
+
+        window_segments = []
+        for result in results:
+            segments, complete = tokens_to_segments(tokenizer, result, offset, window_end)
+            window_segments.append((segments, complete))
+
+        # Re-seek to the last segment of the first options if it was cut
+        cut = window_end
+        segments, complete = window_segments[0]
+        if not complete and len(segments) > 1 and seek + size < content_frames:
+            cut = segments[-1]["start"]
+
+        for k, (segments, _) in enumerate(window_segments):
+            output = outputs[k]
+            if output["language"] is None:
+                output["language"] = results[k].language
+            for segment in segments:
+                if segment["start"] >= cut:
+                    break
+                segment.update({"id": len(output["segments"]), "seek": seek})
+                output["segments"].append(segment)
+                if on_segment is not None:
+                    on_segment(k, segment)
+
+        seek = max(seek + 1, round(cut * FRAMES_PER_SECOND)) if cut < window_end else seek + size
+
+    for output in outputs:
+        output["text"] = "".join(segment["text"] for segment in output["segments"])
+
+    return outputs
@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# HTTP load test of the API: concurrent /run, /bytes and /uri requests
+
+import argparse
+import asyncio
+import json
+import mimetypes
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+import uvicorn
+
+# Saturn2
+from saturn2.backend import configure_executor, ModelLoader
+
+ENDPOINTS = ("run", "bytes", "uri")
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Load test the whisper API with concurrent /run, /bytes and /uri requests',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument('media', type=str, nargs='?', default='test/test.flac', help='Audio file to send')
+    parser.add_argument('--target', type=str, default='inprocess',
+                        help='inprocess (ASGI transport), serve (uvicorn on --port in this process) or a base URL')
+    parser.add_argument('--port', type=int, default=59105, help='Port of --target serve')
+    parser.add_argument('--stub', action='store_true',
+                        help='Replace the model with a stub to measure the framework alone (inprocess/serve)')
+    parser.add_argument('--stub-delay-ms', '--stub_delay_ms', dest='stub_delay_ms', type=float, default=0.0,
+                        help='Time the stub model spends per call')
+    parser.add_argument('--endpoints', type=str, default='run,bytes,uri', help='Comma separated endpoints, sent in turn')
+    parser.add_argument('-n', '--requests', type=int, default=200, help='Total requests')
+    parser.add_argument('-c', '--concurrency', type=int, default=16, help='Requests in flight')
+    parser.add_argument('--lang', type=str, default='ko', help='Language code')
+    parser.add_argument('--no-warmup', '--no_warmup', dest='warmup', action='store_false',
+                        help='Measure the first (cold) request of every endpoint too')
+    parser.add_argument('--token', type=str, default='token-temp', help='API token')
+    parser.add_argument('--timeout', type=float, default=600.0, help='Request timeout in seconds')
+    parser.add_argument('--lag-interval-ms', '--lag_interval_ms', dest='lag_interval_ms', type=float, default=10.0,
+                        help='Period of the event-loop lag probe')
+    parser.add_argument('-o', '--output', type=str, default='exp/benchmark/loadtest.json', help='Output json')
+    return parser
+
+
+class StubModel:
+    """Stands in for the model registry: sleeps, then returns a fixed result"""
+    def __init__(self, delay_ms: float = 0.0) -> None:
+        self.delay = delay_ms / 1000
+
+    def __call__(self, audio_path: str, content_id: str = "", out_dir: str = "", **kwargs: Any) -> Dict:
+        time.sleep(self.delay)
+        return {
+            "audio_info": {"duration": 1.0},
+            kwargs.get("lang") or "ko": {"text": "stub", "script": "stub"},
+        }
+
+    def detect_language(self, *args: Any, **kwargs: Any) -> Dict:
+        return {"language": "ko", "languages": [{"lang": "ko", "prob": 1.0}]}
+
+    def usage(self) -> Dict:
+        return {"default": "stub", "models": {}}
+
+
+def use_stub(delay_ms: float) -> None:
+    """Load the stub instead of the model when the app starts"""
+    import api.app
+    from api.model import config
+
+    def load_stub(loader: ModelLoader) -> StubModel:
+        executor = dict(config.get("executor", {}))
+        configure_executor(
+            kind="thread",
+            max_workers=executor.get("max_workers", 1),
+            max_inflight=executor.get("max_inflight", 0),
+        )
+        return StubModel(delay_ms)
+
+    api.app.load_model = load_stub
+
+
+class LagProbe:
+    """Event-loop lag: how late a periodic sleep wakes up"""
+    def __init__(self, interval_ms: float) -> None:
+        self.interval = interval_ms / 1000
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    def report(self) -> Dict:
+        return {"samples": len(self.lags), **percentiles(self.lags, prefix="lag")}
+
+
+def percentiles(values: List[float], prefix: str) -> Dict[str, float]:
+    if not values:
+        return {}
+    return {
+        f"{prefix}_p50": round(float(np.percentile(values, 50)), 5),
+        f"{prefix}_p95": round(float(np.percentile(values, 95)), 5),
+        f"{prefix}_p99": round(float(np.percentile(values, 99)), 5),
+        f"{prefix}_max": round(float(max(values)), 5),
+    }
+
+
+async def send(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    path: Path,
+    data: bytes,
+    args: argparse.Namespace,
+)-> httpx.Response:
+    params = {"lang": args.lang}
+    if endpoint == "run":
+        files = {"file": (path.name, data, mimetypes.guess_type(path.name)[0] or "application/octet-stream")}
+        return await client.post("run", params=params, files=files)
+    if endpoint == "bytes":
+        headers = {"content-type": f"audio/{path.suffix.lstrip('.') or 'wav'}"}
+        return await client.post("bytes", params=params, content=data, headers=headers)
+    return await client.post("uri", params=params, json={"uri": str(path.resolve())})
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float) -> None:
+    """Wait until the model is loaded"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise TimeoutError("Server is not ready")
+        await asyncio.sleep(0.2)
+
+
+async def load(
+    client: httpx.AsyncClient,
+    args: argparse.Namespace,
+)-> Dict:
+    """Send args.requests requests, args.concurrency at a time, cycling the endpoints"""
+    path = Path(args.media)
+    data = path.read_bytes()
+    endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    for name in endpoints:
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint: {name}")
+
+    await wait_ready(client, args.timeout)
+    if args.warmup:
+        for name in endpoints:
+            await send(client, name, path, data, args)
+
+    samples: Dict[str, List[float]] = {name: [] for name in endpoints}
+    codes: Dict[str, Dict[str, int]] = {name: {} for name in endpoints}
+    next_request = 0
+
+    async def worker() -> None:
+        nonlocal next_request
+        while next_request < args.requests:
+            endpoint = endpoints[next_request % len(endpoints)]
+            next_request += 1
+            start = time.perf_counter()
+            try:
+                response = await send(client, endpoint, path, data, args)
+                code = str(response.status_code)
+                # The batch routes answer 200 with the error code in the body
+                if response.status_code == 200:
+                    code = str(response.json().get("code", code))
+            except httpx.HTTPError as e:
+                code = type(e).__name__
+            samples[endpoint].append(time.perf_counter() - start)
+            codes[endpoint][code] = codes[endpoint].get(code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for values in samples.values() for latency in values]
+    return {
+        "requests": len(latencies),
+        "elapsed": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 3),
+        **percentiles(latencies, prefix="latency"),
+        "endpoints": {
+            name: {
+                "requests": len(values),
+                "requests_per_second": round(len(values) / elapsed, 3),
+                **percentiles(values, prefix="latency"),
+                "codes": codes[name],
+            }
+            for name, values in samples.items()
+        },
+    }
+
+
+async def run_inprocess(args: argparse.Namespace) -> Dict:
+    """Client and app share this event loop (no sockets)"""
+    from api.app import app
+
+    probe = LagProbe(args.lag_interval_ms)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url="http://loadtest/whisper/whisper/v1/",
+            headers={"Authorization": f"Bearer {args.token}"},
+            timeout=args.timeout,
+        ) as client:
+            probe.start()
+            report = await load(client, args)
+            probe.stop()
+    # The loop also runs the client, so the lag includes client work
+    return {**report, "event_loop": {"scope": "shared client/server loop", **probe.report()}}
+
+
+def run_server(
+    args: argparse.Namespace,
+    probe: LagProbe,
+)-> uvicorn.Server:
+    """Run uvicorn with the app on its own thread and event loop"""
+    from api.app import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+
+    async def serve() -> None:
+        probe.start()
+        await server.serve()
+        probe.stop()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    return server
+
+
+async def run_client(
+    args: argparse.Namespace,
+    base_url: str,
+    probe: Optional[LagProbe] = None,
+)-> Dict:
+    client_probe = LagProbe(args.lag_interval_ms)
+    async with httpx.AsyncClient(
+        base_url=base_url.rstrip("/") + "/whisper/whisper/v1/",
+        headers={"Authorization": f"Bearer {args.token}"},
+        timeout=args.timeout,
+        limits=httpx.Limits(max_connections=args.concurrency),
+    ) as client:
+        client_probe.start()
+        report = await load(client, args)
+        client_probe.stop()
+    report["client_event_loop"] = client_probe.report()
+    if probe is not None:
+        report["event_loop"] = {"scope": "server loop", **probe.report()}
+    return report
+
+
+def main():
+    args = get_parser().parse_args()
+    if args.stub:
+        use_stub(args.stub_delay_ms)
+
+    if args.target == "inprocess":
+        report = asyncio.run(run_inprocess(args))
+    elif args.target == "serve":
+        probe = LagProbe(args.lag_interval_ms)
+        server = run_server(args, probe)
+        try:
+            report = asyncio.run(run_client(args, f"http://127.0.0.1:{args.port}", probe))
+        finally:
+            server.should_exit = True
+    else:
+        # A server started elsewhere: only the client loop can be probed
+        report = asyncio.run(run_client(args, args.target))
+
+    report = {
+        "target": args.target,
+        "stub": args.stub,
+        "stub_delay_ms": args.stub_delay_ms if args.stub else None,
+        "media": args.media,
+        "concurrency": args.concurrency,
+        **report,
+    }
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(report, indent=4, ensure_ascii=False), encoding="utf-8")
+    print(json.dumps(report, indent=4, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
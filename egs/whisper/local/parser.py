@@ -19,7 +19,36 @@ def get_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         'media',
         type=str,
-        help='Path to media file: wav, mp3, mp4, flac, etc.'
+        nargs='*',
+        help='Media files (wav, mp3, mp4, flac, etc.), directories or glob patterns'
+    )
+
+    parser.add_argument(
+        '--manifest',
+        type=str,
+        default='',
+        help='File with one media path per line'
+    )
+
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        default=1,
+        help='Worker processes sharing the loaded model'
+    )
+
+    parser.add_argument(
+        '--threads-per-worker', '--threads_per_worker',
+        dest='threads_per_worker',
+        type=int,
+        default=0,
+        help='CPUs per worker (0 divides all CPUs evenly)'
+    )
+
+    parser.add_argument(
+        '--overwrite',
+        action='store_true',
+        help='Transcribe files whose outputs already exist'
     )
 
     parser.add_argument(
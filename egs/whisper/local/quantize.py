@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# Dynamic int8 quantization of whisper models for CPU inference
+
+import uuid
+import torch
+import whisper
+from dataclasses import asdict
+from torch import nn
+from typing import Callable, Dict
+from torch.overrides import TorchFunctionMode
+from whisper.model import ModelDimensions
+
+# Saturn2
+from saturn2.utils.logs import get_logger
+
+# Local
+from local.checkpoint import cache_path
+
+# Define
+logger = get_logger(__name__, level="INFO")
+PRECISIONS = ("fp32", "int8")
+
+
+def quantize_dynamic_int8(model: whisper.model.Whisper) -> whisper.model.Whisper:
+    """Quantize the linear layers of the encoder and decoder to int8
+
+    Weights are stored as int8 and activations are quantized on the fly.
+    whisper's `Linear` only casts its weights to the input dtype, so the
+    layers are turned into plain `nn.Linear` first, which `quantize_dynamic`
+    knows how to replace.
+
+    Args:
+        model (whisper.model.Whisper): FP32 model on CPU.
+    Returns:
+        whisper.model.Whisper: Quantized model (the same instance).
+    """
+    for module in model.modules():
+        if isinstance(module, whisper.model.Linear):
+            module.__class__ = nn.Linear
+    return torch.ao.quantization.quantize_dynamic(
+        model, {nn.Linear}, dtype=torch.qint8, inplace=True,
+    )
+
+
+class _SkipInit(TorchFunctionMode):
+    """Skip the `torch.nn.init` calls of module constructors (weights stay uninitialized)"""
+    def __torch_function__(self, func, types, args=(), kwargs=None):
+        kwargs = kwargs or {}
+        if getattr(func, "__module__", "") == "torch.nn.init":
+            return args[0] if args else kwargs.get("tensor")
+        return func(*args, **kwargs)
+
+
+def quantized_skeleton(
+    dims: Dict[str, int],
+    alignment_heads: torch.Tensor,
+)-> whisper.model.Whisper:
+    """Quantized model with uninitialized weights, to load a state dict into
+
+    The FP32 weights are allocated but never initialized or touched, and
+    the linear layers are swapped for empty dynamic int8 ones.
+
+    Args:
+        dims (Dict[str, int]): Model dimensions (`whisper.model.ModelDimensions`).
+        alignment_heads (torch.Tensor): Dense (n_text_layer, n_text_head) mask.
+    Returns:
+        whisper.model.Whisper: Model with the structure of `quantize_dynamic_int8`.
+    """
+    with _SkipInit():
+        model = whisper.model.Whisper(ModelDimensions(**dims))
+
+    for module in list(model.modules()):
+        for name, child in module.named_children():
+            if isinstance(child, nn.Linear):
+                setattr(module, name, torch.ao.nn.quantized.dynamic.Linear(
+                    child.in_features,
+                    child.out_features,
+                    bias_=child.bias is not None,
+                    dtype=torch.qint8,
+                ))
+    model.register_buffer("alignment_heads", alignment_heads.to_sparse(), persistent=False)
+    return model
+
+
+def load_quantized(
+    load_model: Callable[[], whisper.model.Whisper],
+    model_name: str,
+    cache_dir: str = "",
+    model_path: str = "",
+)-> whisper.model.Whisper:
+    """Load the quantized weights cached on disk, or quantize and cache them
+
+    Only tensors and plain values are cached (the state dict, the model
+    dimensions and the alignment heads) and they are loaded with
+    `weights_only`, so a file in the cache directory cannot run code. On a
+    hit, the weights are loaded into `quantized_skeleton` without loading
+    or quantizing the FP32 model.
+
+    Args:
+        load_model (Callable): Loads the FP32 model on CPU.
+        model_name (str): Model name, used in the cache file name.
+        cache_dir (str): Directory of quantized models ("" to disable).
+        model_path (str): Source checkpoint (name or path) keying the cache; defaults to model_name.
+    Returns:
+        whisper.model.Whisper: Quantized model.
+    """
+    path = cache_path(cache_dir, model_name, model_path or model_name, "int8") if cache_dir else None
+    if path is not None and path.is_file():
+        try:
+            cached = torch.load(path, map_location="cpu", weights_only=True)
+            quantized = quantized_skeleton(cached["dims"], cached["alignment_heads"])
+            quantized.load_state_dict(cached["state_dict"])
+            logger.info(f"Quantized weights loaded: {path}")
+            return quantized
+        except Exception as e:
+            # e.g. a truncated file
+            logger.warning(f"Rebuilding quantized weights {path}: {e}")
+
+    quantized = quantize_dynamic_int8(load_model())
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{uuid.uuid4().hex}.tmp")
+        torch.save({
+            "dims": asdict(quantized.dims),
+            "alignment_heads": quantized.alignment_heads.to_dense(),
+            "state_dict": quantized.state_dict(),
+        }, tmp)
+        tmp.rename(path)
+        logger.info(f"Quantized weights saved: {path}")
+    return quantized
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# Load whisper models on demand and keep them under a memory budget
+
+import time
+import threading
+import yaml
+import torch
+import whisper
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+# Saturn2
+from saturn2.utils.logs import get_logger
+
+# Local
+from local.transcribe import Whisper
+from local.warmup import run_warmup
+
+# Define
+logger = get_logger(__name__, level="INFO")
+
+
+@dataclass
+class ModelStats:
+    """Usage and load statistics of one model
+    """
+    loads: int = 0
+    load_time: float = 0.0
+    calls: int = 0
+    last_used: float = 0.0
+    resident_bytes: int = 0
+    warmup_time: float = 0.0
+    loaded: bool = False
+
+
+def model_bytes(model: Whisper) -> int:
+    """Bytes of the weights of a loaded Whisper model (quantized weights included)
+    """
+    def tensors(value: Any) -> List[torch.Tensor]:
+        if isinstance(value, torch.Tensor):
+            return [value]
+        if isinstance(value, (tuple, list)):
+            return [t for v in value for t in tensors(v)]
+        return []
+
+    state = model.whisper_model.state_dict(keep_vars=True)
+    return sum(
+        t.numel() * t.element_size()
+        for value in state.values()
+        for t in tensors(value)
+        if not t.is_sparse
+    )
+
+
+class ModelRegistry:
+    """Whisper models loaded by name on first use
+
+    When the resident weights exceed `memory_budget_mb`, the least recently
+    used models are evicted (the model just requested is always kept).
+    Calls are forwarded to the model named by the `model_name` keyword.
+    """
+    def __init__(
+        self,
+        factory: Callable[[str], Whisper],
+        default: str,
+        memory_budget_mb: float = 0,
+        allowed: Optional[List[str]] = None,
+    )-> None:
+        """Initialize the registry
+
+        Args:
+            factory (Callable): Builds a Whisper instance from a model name.
+            default (str): Model used when no model_name is given.
+            memory_budget_mb (float): Budget of resident weights (0 for no limit).
+            allowed (List[str], optional): Model names that may be loaded.
+                Defaults to whisper.available_models().
+        """
+        self.factory = factory
+        self.default = default
+        self.memory_budget = int(memory_budget_mb * 1024 ** 2)
+        self.allowed = set(allowed or whisper.available_models())
+        self.allowed.add(default)
+
+        self.models: "OrderedDict[str, Whisper]" = OrderedDict()
+        self.stats: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    @classmethod
+    def from_config_yaml(
+        cls,
+        config_yaml: str,
+        **kwargs,
+    )-> 'ModelRegistry':
+        """Form configuration yml (`registry` section), loading the default model
+
+        Args:
+            config_yaml (str): Path to the configuration yml file.
+            **kwargs: Arguments for every `Whisper`, e.g. on_cache_event.
+        """
+        config = yaml.safe_load(open(config_yaml, "r", encoding="utf-8"))
+        options = config.get("registry", {})
+        registry = cls(
+            factory=lambda name: Whisper.from_config_yaml(config_yaml, model_name=name, **kwargs),
+            default=config.get("model_name", "medium"),
+            memory_budget_mb=options.get("memory_budget_mb", 0),
+            allowed=options.get("allowed"),
+        )
+        for name in [registry.default] + options.get("preload", []):
+            registry.get(name)
+        return registry
+
+    def get(self, model_name: str = "") -> Whisper:
+        """Return the model, loading it (and evicting others) if needed
+
+        Raises:
+            ValueError: If the model name is not allowed.
+        """
+        name = model_name or self.default
+        if name not in self.allowed:
+            raise ValueError(f"Model {name} is not available")
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        # One load per model at a time; other models keep serving
+        with load_lock:
+            with self._lock:
+                model = self.models.get(name)
+            if model is None:
+                model = self._load(name)
+
+        with self._lock:
+            self.models[name] = model
+            self.models.move_to_end(name)
+            stats = self.stats[name]
+            stats.calls += 1
+            stats.last_used = time.time()
+            self._evict(keep=name)
+        return model
+
+    def __call__(self, *args: Any, model_name: str = "", **kwargs: Any) -> Any:
+        return self.get(model_name)(*args, **kwargs)
+
+    def detect_language(self, *args: Any, model_name: str = "", **kwargs: Any) -> Dict:
+        return self.get(model_name).detect_language(*args, **kwargs)
+
+    def resident_bytes(self) -> int:
+        """Bytes of the weights of all loaded models
+        """
+        with self._lock:
+            return sum(self.stats[name].resident_bytes for name in self.models)
+
+    def usage(self) -> Dict[str, Any]:
+        """Per-model usage and load-time statistics
+        """
+        with self._lock:
+            return {
+                "default": self.default,
+                "memory_budget_bytes": self.memory_budget,
+                "resident_bytes": sum(self.stats[name].resident_bytes for name in self.models),
+                "models": {name: asdict(stats) for name, stats in self.stats.items()},
+            }
+
+    def _load(self, name: str) -> Whisper:
+        start = time.time()
+        model = self.factory(name)
+        load_time = time.time() - start
+
+        # Serve only after the first-request costs are paid
+        warmup_time = 0.0
+        if model.warmup.get("enabled", False):
+            start = time.time()
+            run_warmup(
+                model,
+                durations_s=model.warmup.get("durations_s", [5, 30]),
+                tasks=model.warmup.get("tasks", ["transcribe"]),
+            )
+            warmup_time = time.time() - start
+
+        with self._lock:
+            stats = self.stats.setdefault(name, ModelStats())
+            stats.loads += 1
+            stats.load_time = round(load_time, 3)
+            stats.warmup_time = round(warmup_time, 3)
+            stats.resident_bytes = model_bytes(model)
+            stats.loaded = True
+        logger.info(
+            f"Model loaded: {name} ({stats.resident_bytes / 1024 ** 2:.1f} MB, "
+            f"{load_time:.2f}s, warm-up {warmup_time:.2f}s)"
+        )
+        return model
+
+    def _evict(self, keep: str) -> None:
+        # Called with self._lock held
+        if not self.memory_budget:
+            return
+        total = sum(self.stats[name].resident_bytes for name in self.models)
+        for name in list(self.models):
+            if total <= self.memory_budget:
+                break
+            if name == keep:
+                continue
+            model = self.models.pop(name)
+            if model.scheduler is not None:
+                # Release the scheduler thread's reference to the weights
+                model.scheduler.close(wait=False)
+            self.stats[name].loaded = False
+            total -= self.stats[name].resident_bytes
+            logger.info(f"Model evicted: {name}")
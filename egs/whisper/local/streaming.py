@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# Incremental transcription of a live audio stream
+
+import numpy as np
+from typing import Any, Dict, List, Tuple
+from whisper.audio import N_FRAMES, SAMPLE_RATE, pad_or_trim
+from whisper.tokenizer import get_tokenizer
+
+# Local
+from local.decoding import (
+    NO_SPEECH_THRESHOLD,
+    LOGPROB_THRESHOLD,
+    compute_mel,
+    decode_batch,
+    decode_with_fallback,
+    tokens_to_segments,
+)
+
+# Define
+WINDOW_S = N_FRAMES / 100  # 30 seconds
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """Convert 16-bit little-endian PCM to float32 audio in [-1, 1]"""
+    return np.frombuffer(data[:len(data) // 2 * 2], np.int16).astype(np.float32) / 32768.0
+
+
+class StreamingSession:
+    """Transcribe a live audio stream over a rolling buffer
+
+    Each update decodes the whole buffer (at most one 30-second window).
+    Segments on which two consecutive hypotheses agree are committed as
+    final and cut from the buffer, so final text is never revised. The
+    rest of the hypothesis is returned as partial text.
+    """
+    def __init__(
+        self,
+        model: Any,
+        task: str = "transcribe",
+        lang: str = "ko",
+        min_chunk_s: float = 1.0,
+        max_buffer_s: float = 20.0,
+    )-> None:
+        """Initialize the session
+
+        Args:
+            model (Whisper): Loaded `local.transcribe.Whisper` instance.
+            task (str): 'transcribe' or 'translate'.
+            lang (str): Language code, or 'auto' to detect.
+            min_chunk_s (float): New audio needed before the next update.
+            max_buffer_s (float): Buffer length that forces a commit.
+        """
+        self.model = model
+        self.task = task
+        self.lang = lang
+        self.min_chunk_s = min_chunk_s
+        self.max_buffer_s = min(max_buffer_s, WINDOW_S - min_chunk_s)
+
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.offset = 0.0   # stream time of the buffer start
+        self.pending = 0    # samples received since the last update
+        self.hypothesis: List[Dict] = []
+        self.committed: List[Dict] = []
+        self.tokenizer = get_tokenizer(
+            model.whisper_model.is_multilingual,
+            num_languages=model.whisper_model.num_languages,
+        )
+
+    def insert_audio(self, audio: np.ndarray) -> None:
+        """Append 16 kHz mono float32 audio to the buffer"""
+        self.buffer = np.concatenate([self.buffer, audio.astype(np.float32)])
+        self.pending += len(audio)
+
+    def ready(self) -> bool:
+        """Whether enough new audio arrived for an update"""
+        return self.pending >= self.min_chunk_s * SAMPLE_RATE
+
+    def process(self) -> Dict:
+        """Decode the buffer and commit the segments two hypotheses agree on
+
+        Returns:
+            Dict: {"final": newly committed segments, "partial": uncommitted text}
+        """
+        self.pending = 0
+        segments, complete = self._decode()
+
+        # Local agreement: leading segments equal to the previous hypothesis.
+        # The last segment is not final while it can still grow.
+        stable = len(segments) if complete else len(segments) - 1
+        agreed = 0
+        while (
+            agreed < min(stable, len(self.hypothesis))
+            and segments[agreed]["text"].strip() == self.hypothesis[agreed]["text"].strip()
+        ):
+            agreed += 1
+
+        # Keep the buffer within one window
+        if len(self.buffer) / SAMPLE_RATE > self.max_buffer_s:
+            agreed = max(agreed, stable, min(1, len(segments)))
+            if not segments:
+                self._trim(len(self.buffer) / SAMPLE_RATE - self.min_chunk_s)
+
+        final = self._commit(segments[:agreed])
+        self.hypothesis = segments[agreed:]
+        return {
+            "final": final,
+            "partial": "".join(segment["text"] for segment in self.hypothesis),
+        }
+
+    def finish(self) -> Dict:
+        """Decode the rest of the buffer and commit everything
+
+        Returns:
+            Dict: {"final": newly committed segments, "partial": ""}
+        """
+        segments = self._decode()[0] if len(self.buffer) else []
+        final = self._commit(segments)
+        self.hypothesis = []
+        self.buffer = np.zeros(0, dtype=np.float32)
+        return {"final": final, "partial": ""}
+
+    def _decode(self) -> Tuple[List[Dict], bool]:
+        whisper_model = self.model.whisper_model
+        mel = compute_mel(whisper_model, self.buffer)
+        window = pad_or_trim(mel[:, :N_FRAMES], N_FRAMES)
+
+        prompt = "".join(segment["text"] for segment in self.committed[-5:])
+        options = self.model.window_options(self.task, self.lang, prompt=prompt or None)
+        if self.model.scheduler is not None:
+            decode_fn = self.model.scheduler.decode
+        else:
+            decode_fn = lambda window, options_list: decode_batch(whisper_model, [window], [options_list])[0]
+        result = decode_with_fallback(decode_fn, window, [options])[0]
+
+        if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+            return [], True
+
+        buffer_end = self.offset + len(self.buffer) / SAMPLE_RATE
+        return tokens_to_segments(self.tokenizer, result, self.offset, buffer_end)
+
+    def _commit(self, segments: List[Dict]) -> List[Dict]:
+        final = []
+        for segment in segments:
+            segment = {**segment, "id": len(self.committed)}
+            segment.pop("tokens", None)
+            self.committed.append(segment)
+            final.append(segment)
+        if final:
+            self._trim(final[-1]["end"] - self.offset)
+        return final
+
+    def _trim(self, seconds: float) -> None:
+        cut = max(0, min(len(self.buffer), int(seconds * SAMPLE_RATE)))
+        self.buffer = self.buffer[cut:]
+        self.offset += cut / SAMPLE_RATE
@@ -4,28 +4,53 @@
 # AUTHORS:
 # Sukbong Kwon (Galois)
 
+import copy
+import hashlib
+import functools
+import contextvars
+import shutil
+from collections import OrderedDict
 import yaml
 import torch
 import whisper
 import uuid
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 # Saturn2
 from saturn2.utils.logs import get_logger
-from saturn2.media.helper.inspect_audio import get_audio_info
+from saturn2.media.helper.load_audio import load_audio, SAMPLE_RATE
+from saturn2.media.helper.vad import detect_speech, split_on_silence
 from saturn2.helper.decorators import decoding_time_decorator
+from saturn2.helper.cache import DiskCache, cache_key, file_sha256
+from saturn2.helper.timing import timed, stage, time_module, profile as profile_trace
+from saturn2.helper.cpu import inherit_limits
 
 # Local
-from local.utils import result2srt, result2vtt, result2json, result2script
+from local.utils import result2srt, result2vtt, result2json, result2script, stitch_results
 from local.langmap import whisper_supported_languages
+from local.decoding import transcribe_windows, thread_safe_kv_cache
+from local.batching import BatchScheduler
+from local.quantize import PRECISIONS, load_quantized
+from local.checkpoint import load_converted
 
 # Define
 logger = get_logger(__name__, level="INFO")
+ARTIFACT_KEYS = ("json_path", "srt", "vtt")
 
 class WhisperConfig(BaseModel):
     whisper_model: Any = None
+    scheduler: Any = None
+    result_cache: Any = None
+    language_cache: Any = None
+    model_name: str = Field(
+        default="medium",
+        description="Model name of whisper",
+    )
     device: str = Field(
         default="cuda" if torch.cuda.is_available() else "cpu",
         description="Device to use for the model",
@@ -46,6 +71,30 @@ class WhisperConfig(BaseModel):
         default={},
         description="Decoding options for the model",
     )
+    batching: Dict = Field(
+        default={},
+        description="Cross-request batching: enabled, max_batch_size, max_wait_ms",
+    )
+    vad: Dict = Field(
+        default={},
+        description="VAD chunking of long audio: enabled, min_duration_s, max_chunk_s, workers, ...",
+    )
+    cache: Dict = Field(
+        default={},
+        description="Result cache keyed by audio content: enabled, root, max_bytes",
+    )
+    precision: str = Field(
+        default="fp32",
+        description="Precision on CPU: fp32, or int8 for dynamically quantized linear layers",
+    )
+    model_cache_dir: str = Field(
+        default="",
+        description="Directory of converted models reused across starts",
+    )
+    warmup: Dict = Field(
+        default={},
+        description="Warm-up on synthetic audio after loading: enabled, durations_s, tasks",
+    )
 
 class Whisper(WhisperConfig):
     """Speech recognition with OpenAI whisper model (`Whisper`)
@@ -54,15 +103,19 @@ class Whisper(WhisperConfig):
         self,
         model_name: str = "medium",
         nocuda: bool = False,
+        on_cache_event: Optional[Callable[[str, str], None]] = None,
         **kwargs,
     )-> None:
         """Initialize the Whisper instance
         Args:
             model_name (str, optional): Model name of whisper, tiny, base, small, medium, large or turbo. Defaults to "turbo".
             nocuda (bool, optional): Disable CUDA. Defaults to False.
+            on_cache_event (Callable, optional): Called with the cache name and
+                'hit', 'miss' or 'eviction' (e.g. `saturn2.backend.observe_cache`).
             **kwargs: Additional arguments for the WhisperConfig class.
         """
         super().__init__(**kwargs)
+        self.model_name = model_name
 
         # Set device
         self.device = "cuda" if torch.cuda.is_available() and not nocuda else "cpu"
@@ -75,29 +128,76 @@ class Whisper(WhisperConfig):
         else:
             model_path = f"{model_root}/{model_name}.pt"
 
-        self.whisper_model = whisper.load_model(model_path) # type: ignore
-        logger.info(f"Model loaded: {model_path}")
+        if self.precision not in PRECISIONS:
+            raise ValueError(f"Precision {self.precision} is not supported")
+
+        def load_original() -> whisper.model.Whisper:
+            whisper_model = whisper.load_model(model_path, device=self.device) # type: ignore
+            logger.info(f"Model loaded: {model_path}")
+
+            # Convert model to FP32 precision if device is CPU
+            if self.device == "cpu":
+                whisper_model = whisper_model.to(torch.float32)
+                logger.info("Converted Whisper model to FP32 precision")
+            return whisper_model
+
+        def load_model() -> whisper.model.Whisper:
+            # On CPU, map the FP32 checkpoint converted by an earlier start
+            if self.device == "cpu":
+                return load_converted(load_original, model_name, self.model_cache_dir, model_path)
+            return load_original()
+
+        # Dynamic int8 quantization of the linear layers (CPU only)
+        if self.device == "cpu" and self.precision == "int8":
+            self.whisper_model = load_quantized(load_model, model_name, self.model_cache_dir, model_path)
+            logger.info("Whisper model precision: int8")
+        else:
+            self.whisper_model = load_model()
+
+        # Concurrent requests and VAD chunks decode with the same model
+        thread_safe_kv_cache(self.whisper_model)
 
-        # Convert model to FP32 precision if device is CPU
-        if self.device == "cpu":
-            self.whisper_model = self.whisper_model.to(torch.float32)
-            logger.info("Converted Whisper model to FP32 precision")
+        # Encoder and decoder passes show up as stages of the request timing
+        time_module(self.whisper_model.encoder, "encoder")
+        time_module(self.whisper_model.decoder, "decoder")
 
         # Set decoding options for the model
         self.decoding_options = whisper.DecodingOptions(language=self.lang, fp16=False) # type: ignore
         logger.info(f"Decoding options: {self.decoding_options}")
 
+        # Batch mel windows across concurrent requests
+        if self.batching.get("enabled", False):
+            self.scheduler = BatchScheduler(
+                self.whisper_model,
+                max_batch_size=self.batching.get("max_batch_size", 8),
+                max_wait_ms=self.batching.get("max_wait_ms", 10.0),
+            )
+            logger.info(f"Batching enabled: {self.batching}")
+
+        # Cache results by audio content and options
+        if self.cache.get("enabled", False):
+            self.result_cache = DiskCache(
+                root=self.cache.get("root", "exp/cache"),
+                max_bytes=int(self.cache.get("max_bytes", 1024 ** 3)),
+                on_event=functools.partial(on_cache_event, "result") if on_cache_event else None,
+            )
+            logger.info(f"Result cache enabled: {self.cache}")
+        self.language_cache = OrderedDict()
+
     @classmethod
     def from_config_yaml(
         cls,
-        config_yaml: str
+        config_yaml: str,
+        **kwargs,
     )-> 'Whisper':
         """Form configuration yml
 
         Args:
             config_yaml (str): Path to the configuration yml file.
+            **kwargs: Values overriding the configuration, e.g. model_name.
         """
-        return cls(**yaml.safe_load(open(config_yaml, "r", encoding="utf-8")))
+        config = yaml.safe_load(open(config_yaml, "r", encoding="utf-8"))
+        return cls(**{**config, **kwargs})
 
     @decoding_time_decorator
     def __call__(
@@ -107,15 +207,34 @@ class Whisper(WhisperConfig):
         out_dir: str = "",
         task: str = "",
         lang: str = "",
+        on_segment: Optional[Callable[[Dict], None]] = None,
+        profile: str = "",
+        audio: Optional[np.ndarray] = None,
+        audio_info: Optional[Dict] = None,
+        audio_hash: str = "",
     )-> Dict:
         """Speech recognition with OpenAI whisper model
 
+        The result has a per-stage breakdown (wall/CPU time, RTF) under
+        'timing': hash, cache_lookup, load_audio, language_detection, decode
+        (with mel, encoder and decoder inside it), write and cache_store.
+        Whisper re-encodes a window on every temperature fallback, so more
+        encoder passes than windows means fallback retries.
+
         Args:
             audio_path (str): Audio file path
             content_id (str): Content ID
             out_dir (str): Output directory to save temporary files
             task (str, optional): Task name. Defaults to "".
-            lang (str, optional): Language code. Defaults to "".
+            lang (str, optional): Language code, or 'auto' to detect it first. Defaults to "".
+            on_segment (Callable, optional): Called with each segment (and its task)
+                as soon as it is decoded. Audio is then decoded window by window.
+            profile (str, optional): 'cprofile' or 'torch' to save a profiler trace
+                under <out_dir>/profile; its path is returned as 'profile'.
+            audio (np.ndarray, optional): Audio already decoded to 16 kHz mono float32
+                (e.g. from request bytes). audio_path is then only used to name the outputs.
+            audio_info (Dict, optional): Audio information of `audio`.
+            audio_hash (str, optional): Content hash of the encoded audio, for the caches.
         """
         logger.info(f"Transcribe audio: {audio_path}")
 
@@ -125,35 +244,294 @@ class Whisper(WhisperConfig):
         task = task or self.task
 
         # Check if language is supported by whisper
-        if lang not in whisper_supported_languages:
+        if lang != "auto" and lang not in whisper_supported_languages:
             raise ValueError(f"Language {lang} is not supported by whisper")
 
+        # Check the task before any decoding
+        if task not in ("transcribe", "translate", "all"):
+            raise ValueError(f"Task {task} is not supported")
+
         logger.info(f"Lang: {lang}, Out dir: {out_dir}, Task: {task}")
 
-        # Set task list if task is "all" else set task list to [task]
+        # Task "all" runs transcribe and translate on a shared encoder pass
         task_list = ["transcribe", "translate"] if task == "all" else [task]
         logger.info(f"Running {', '.join(task_list)} on: {audio_path}")
 
-        # Get audio info
-        result: Dict[str, Any] = {"audio_info": get_audio_info(audio_path)}
-
         # Set content_id if not provided
         content_id = content_id or str(uuid.uuid4())
 
+        # Time every stage, and capture a profiler trace on request
+        trace_path = str(Path(out_dir) / "profile" / f"{content_id}.{task}")
+        with timed() as timer, profile_trace(profile, trace_path) as trace:
+            result = self.recognize(
+                audio_path,
+                content_id,
+                out_dir,
+                task,
+                lang,
+                on_segment=on_segment,
+                audio=audio,
+                audio_info=audio_info,
+                audio_hash=audio_hash,
+            )
+        result["timing"] = timer.report(result.get("audio_info", {}).get("duration", 0))
+        if trace is not None:
+            result["profile"] = trace
+            logger.info(f"Profile trace: {trace}")
+
+        return result
+
+    def recognize(
+        self,
+        audio_path: str,
+        content_id: str,
+        out_dir: str,
+        task: str,
+        lang: str,
+        on_segment: Optional[Callable[[Dict], None]] = None,
+        audio: Optional[np.ndarray] = None,
+        audio_info: Optional[Dict] = None,
+        audio_hash: str = "",
+    )-> Dict:
+        """Cache lookup, audio decoding, language detection and recognition
+        of `__call__`, each timed as a stage
+
+        Args:
+            audio_path (str): Audio file path
+            content_id (str): Content ID
+            out_dir (str): Output directory to save temporary files
+            task (str): 'transcribe', 'translate' or 'all'.
+            lang (str): Language code, or 'auto' to detect it first.
+            on_segment (Callable, optional): Called with each segment as soon as it is decoded.
+            audio (np.ndarray, optional): Decoded audio (not read from audio_path).
+            audio_info (Dict, optional): Audio information of `audio`.
+            audio_hash (str, optional): Content hash of the encoded audio.
+
+        Returns:
+            Dict: Recognition result
+        """
+
+        # Content hash for the result and language caches
+        if not audio_hash and (self.result_cache is not None or lang == "auto"):
+            with stage("hash"):
+                audio_hash = (
+                    file_sha256(audio_path) if audio is None
+                    else hashlib.sha256(audio.tobytes()).hexdigest()
+                )
+
+        # Return the cached result of the same audio and options
+        key = None
+        if self.result_cache is not None:
+            key = cache_key(
+                audio=audio_hash,
+                model=self.model_name,
+                precision=self.precision,
+                task=task,
+                lang=lang,
+                options=self.decoding_options,
+                vad=self.vad,
+                windowed=self.scheduler is not None,
+            )
+            if on_segment is None:
+                with stage("cache_lookup"):
+                    cached = self.load_cached(key, audio_path, content_id, out_dir, lang)
+                if cached is not None:
+                    logger.info(f"Cache hit: {audio_path}")
+                    return cached
+
+        # Decode audio once and get audio info from the same decode
+        if audio is None:
+            with stage("load_audio"):
+                audio, audio_info = load_audio(audio_path)
+        result: Dict[str, Any] = {"audio_info": audio_info or {"duration": round(len(audio) / SAMPLE_RATE, 3)}}
+
+        # Detect the language once and decode with it pinned
+        if lang == "auto":
+            with stage("language_detection"):
+                detection = self.detect_language(audio_path, audio=audio, audio_hash=audio_hash)
+            lang = detection["language"]
+            result["language_detection"] = detection
+            logger.info(f"Detected language: {lang}")
+
         # Transcribe audio (translate is optional)
-        for t in task_list:
+        if task == "all":
+            result[lang] = self.transcribe_all(
+                audio_path=audio_path,
+                content_id=content_id,
+                out_dir=out_dir,
+                lang=lang,
+                audio=audio,
+                on_segment=on_segment,
+            )
+        else:
             result[lang] = self.transcribe(
                 audio_path=audio_path,
                 content_id=content_id,
                 out_dir=out_dir,
-                task=t,
+                task=task,
                 lang=lang,
+                audio=audio,
+                on_segment=on_segment,
             )
 
         logger.info(f"Transcription completed: {audio_path}")
 
+        if key is not None:
+            with stage("cache_store"):
+                self.store_cached(key, result, audio_path)
+
+        return result
+
+    def detect_language(
+        self,
+        audio_path: str,
+        content_id: str = "",
+        out_dir: str = "",
+        top_k: int = 3,
+        audio: Optional[np.ndarray] = None,
+        audio_hash: str = "",
+    )-> Dict:
+        """Identify the spoken language from the first 30 seconds of speech
+
+        Only the encoder and one decoder step run, on the window starting at
+        the first speech region. Detections are cached per content hash.
+
+        Args:
+            audio_path (str): Path to the audio file.
+            content_id (str): Content ID (unused, for the route helpers)
+            out_dir (str): Output directory (unused, for the route helpers)
+            top_k (int): Number of languages to return.
+            audio (np.ndarray, optional): Decoded 16 kHz audio of audio_path.
+            audio_hash (str, optional): Content hash of audio_path.
+
+        Returns:
+            Dict: {"language": code, "languages": [{"lang", "prob"}, ...]}
+        """
+        key = cache_key(
+            audio=audio_hash or file_sha256(audio_path),
+            model=self.model_name,
+            precision=self.precision,
+            purpose="language",
+        )
+        ranked = self.cached_language(key)
+        if ranked is None:
+            if audio is None:
+                audio, _ = load_audio(audio_path)
+            ranked = self.rank_languages(audio)
+            self.store_language(key, ranked)
+
+        return {"language": ranked[0]["lang"], "languages": ranked[:top_k]}
+
+    def rank_languages(
+        self,
+        audio: np.ndarray,
+        top_k: int = 10,
+    )-> List[Dict]:
+        """Language probabilities of the first 30 seconds of speech
+
+        Args:
+            audio (np.ndarray): 16 kHz mono float32 audio.
+            top_k (int): Number of languages to keep.
+
+        Returns:
+            List[Dict]: [{"lang", "prob"}, ...] sorted by probability
+        """
+        regions = detect_speech(audio, SAMPLE_RATE)
+        start = regions[0][0] if regions else 0
+        window = whisper.pad_or_trim(audio[start:start + whisper.audio.N_SAMPLES])
+        mel = whisper.log_mel_spectrogram(window, self.whisper_model.dims.n_mels)
+
+        with torch.no_grad():
+            _, probs = self.whisper_model.detect_language(mel.to(self.whisper_model.device))
+
+        ranked = sorted(probs.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [{"lang": lang, "prob": round(float(prob), 4)} for lang, prob in ranked]
+
+    def cached_language(self, key: str) -> Optional[List[Dict]]:
+        """Ranked languages of a previous detection, from disk or memory"""
+        if self.result_cache is not None:
+            cached = self.result_cache.get(key)
+            return cached[0]["languages"] if cached is not None else None
+        if key in self.language_cache:
+            self.language_cache.move_to_end(key)
+            return self.language_cache[key]
+        return None
+
+    def store_language(self, key: str, ranked: List[Dict]) -> None:
+        """Keep a detection in the result cache, or in a bounded memory cache"""
+        if self.result_cache is not None:
+            self.result_cache.put(key, {"languages": ranked}, {})
+            return
+        self.language_cache[key] = ranked
+        while len(self.language_cache) > 1024:
+            self.language_cache.popitem(last=False)
+
+    def load_cached(
+        self,
+        key: str,
+        audio_path: str,
+        content_id: str,
+        out_dir: str,
+        lang: str,
+    )-> Optional[Dict]:
+        """Restore a cached result and copy its json/srt/vtt files to the output folder
+
+        Args:
+            key (str): Cache key
+            audio_path (str): Path to the audio file (used for file names).
+            content_id (str): Content ID
+            out_dir (str): Base output directory.
+            lang (str): Language code.
+
+        Returns:
+            Optional[Dict]: Recognition result, or None on a cache miss
+        """
+        cached = self.result_cache.get(key)
+        if cached is None:
+            return None
+        result, entry = cached
+
+        # Results of lang='auto' are saved under the detected language
+        lang = result.get("language_detection", {}).get("language", lang)
+        folder = Path(out_dir) / lang / content_id
+        folder.mkdir(parents=True, exist_ok=True)
+        stem = Path(audio_path).stem
+        try:
+            for item in _artifacts(result):
+                for name in ARTIFACT_KEYS:
+                    target = folder / f"{stem}{item[name]}"
+                    shutil.copyfile(entry / item[name], target)
+                    item[name] = str(target)
+        except OSError as e:
+            # Evicted by another worker after the lookup: decode again
+            logger.warning(f"Cache entry {key} is gone: {e}")
+            return None
+
+        result["cached"] = True
         return result
 
+    def store_cached(
+        self,
+        key: str,
+        result: Dict,
+        audio_path: str,
+    )-> None:
+        """Store the result and its json/srt/vtt files in the cache
+
+        File paths are stored relative to the audio file stem
+        (e.g. '.json', '.translate.srt') so that a hit can restore them
+        under another file name.
+        """
+        stem = Path(audio_path).stem
+        data = copy.deepcopy(result)
+        files = {}
+        for item in _artifacts(data):
+            for name in ARTIFACT_KEYS:
+                path = Path(item[name])
+                item[name] = path.name[len(stem):]
+                files[item[name]] = str(path)
+        self.result_cache.put(key, data, files)
+
     def transcribe(
         self,
         audio_path: str,
@@ -161,6 +539,8 @@ class Whisper(WhisperConfig):
         out_dir: str,
         task: str,
         lang: str,
+        audio: Optional[np.ndarray] = None,
+        on_segment: Optional[Callable[[Dict], None]] = None,
     )-> Dict:
         """Transcribe audio_path with OpenAI whisper model
 
@@ -170,40 +550,207 @@ class Whisper(WhisperConfig):
             out_dir (str): Base output directory.
             task    (str): 'transcribe' or 'translate'.
             lang    (str): Language code to decode in (e.g. 'ko', 'en', 'fr', ...).
+            audio (np.ndarray, optional): Decoded 16 kHz audio of audio_path.
+                Decoded from audio_path if not given.
+            on_segment (Callable, optional): Called with each segment as soon as it is decoded.
 
         Returns:
             Dict: Recognition result
         """
-        # SETP 1: Run whisper
+        if audio is None:
+            audio, _ = load_audio(audio_path)
+
+        # SETP 1: Run whisper (on VAD chunks in parallel for long audio)
+        with stage("decode"):
+            if on_segment is not None:
+                result = self.transcribe_windows(
+                    audio,
+                    tasks=[task],
+                    lang=lang,
+                    on_segment=lambda _, segment: on_segment({"task": task, **segment}),
+                )[0]
+            elif self.use_vad(audio):
+                result = self.decode_chunks(audio, lambda chunk: [self.decode(chunk, task, lang)])[0]
+            else:
+                result = self.decode(audio, task, lang)
+
+        return self.save_result(result, audio_path, content_id, out_dir, lang)
+
+    def decode(
+        self,
+        audio: np.ndarray,
+        task: str,
+        lang: str,
+    )-> Dict:
+        """Run whisper on decoded audio
+
+        Args:
+            audio (np.ndarray): 16 kHz mono float32 audio.
+            task (str): 'transcribe' or 'translate'.
+            lang (str): Language code, or 'auto' to detect.
+
+        Returns:
+            Dict: Whisper result with segments
+        """
+        # With batching, windows are decoded together with other requests
+        if self.scheduler is not None:
+            result = self.transcribe_windows(
+                audio,
+                tasks=[task],
+                lang=lang,
+            )[0]
         # if lang is "auto", using lang detection
-        if lang == "auto":
+        elif lang == "auto":
             result = self.whisper_model.transcribe(
-                audio_path,
+                audio,
                 task=task,
                 **({} if self.device == "cuda" else {"fp16": False})
             )
         else:
             result = self.whisper_model.transcribe(
-                audio_path,
+                audio,
                 language=lang,
                 task=task,
                 **({} if self.device == "cuda" else {"fp16": False})
             )
+        return result
+
+    def use_vad(self, audio: np.ndarray) -> bool:
+        """Whether audio is long enough to be split into VAD chunks
+        """
+        return (
+            self.vad.get("enabled", False)
+            and len(audio) / SAMPLE_RATE >= self.vad.get("min_duration_s", 60.0)
+        )
+
+    def decode_chunks(
+        self,
+        audio: np.ndarray,
+        decode_fn: Callable[[np.ndarray], List[Dict]],
+    )-> List[Dict]:
+        """Split audio at silences and decode the chunks in parallel
+
+        Chunks are independent, so they run on `vad.workers` threads (or
+        share batches when batching is enabled). The chunk results are
+        stitched back with their offsets.
+
+        Args:
+            audio (np.ndarray): 16 kHz mono float32 audio.
+            decode_fn (Callable): Decodes one chunk into a list of results (e.g. one per task).
 
+        Returns:
+            List[Dict]: Stitched results, in the order returned by decode_fn
+        """
+        chunks = split_on_silence(
+            audio,
+            SAMPLE_RATE,
+            max_chunk_s=self.vad.get("max_chunk_s", 30.0),
+            threshold_db=self.vad.get("threshold_db", -35.0),
+            min_silence_ms=self.vad.get("min_silence_ms", 500),
+        )
+        logger.info(f"VAD chunks: {len(chunks)}")
+        if not chunks:
+            return decode_fn(audio)
+
+        # Chunk threads run in copies of this context, so they add to its stage timer,
+        # and share the CPUs of the executor slot running this call
+        contexts = [contextvars.copy_context() for _ in chunks]
+        workers = self.vad.get("workers", 4)
+        with ThreadPoolExecutor(max_workers=workers, initializer=inherit_limits(workers)) as pool:
+            parts = list(pool.map(
+                lambda context, chunk: context.run(decode_fn, audio[chunk[0]:chunk[1]]),
+                contexts,
+                chunks,
+            ))
+
+        return [
+            stitch_results([(start / SAMPLE_RATE, part[k]) for (start, _), part in zip(chunks, parts)])
+            for k in range(len(parts[0]))
+        ]
+
+    def transcribe_all(
+        self,
+        audio_path: str,
+        content_id: str,
+        out_dir: str,
+        lang: str,
+        audio: np.ndarray,
+        on_segment: Optional[Callable[[Dict], None]] = None,
+    )-> Dict:
+        """Transcribe and translate audio with one mel and encoder pass per window
+
+        Args:
+            audio_path (str): Path to the audio file.
+            content_id (str): Content ID
+            out_dir (str): Base output directory.
+            lang (str): Language code to decode in.
+            audio (np.ndarray): Decoded 16 kHz audio of audio_path.
+            on_segment (Callable, optional): Called with each segment as soon as it is decoded.
+
+        Returns:
+            Dict: Recognition result per task ('transcribe', 'translate')
+        """
+        tasks = ["transcribe", "translate"]
+        with stage("decode"):
+            if on_segment is not None:
+                results = self.transcribe_windows(
+                    audio,
+                    tasks=tasks,
+                    lang=lang,
+                    on_segment=lambda k, segment: on_segment({"task": tasks[k], **segment}),
+                )
+            else:
+                decode_fn = lambda chunk: self.transcribe_windows(chunk, tasks=tasks, lang=lang)
+                results = self.decode_chunks(audio, decode_fn) if self.use_vad(audio) else decode_fn(audio)
+        return {
+            task: self.save_result(
+                result,
+                audio_path,
+                content_id,
+                out_dir,
+                lang,
+                suffix="" if task == "transcribe" else f".{task}",
+            )
+            for task, result in zip(tasks, results)
+        }
+
+    def save_result(
+        self,
+        result: Dict,
+        audio_path: str,
+        content_id: str,
+        out_dir: str,
+        lang: str,
+        suffix: str = "",
+    )-> Dict:
+        """Save the result as json/srt/vtt and add the paths and script to it
+
+        Args:
+            result (Dict): Whisper result with segments.
+            audio_path (str): Path to the audio file (used for file names).
+            content_id (str): Content ID
+            out_dir (str): Base output directory.
+            lang (str): Language code.
+            suffix (str): Suffix of the file names, e.g. '.translate'.
+
+        Returns:
+            Dict: Recognition result
+        """
         # SETP 2: Prepare language-specific output folder
         folder = Path(out_dir) / lang / content_id
         folder.mkdir(parents=True, exist_ok=True)
 
         # SETP 3: Define the save path
-        stem = Path(audio_path).stem
+        stem = Path(audio_path).stem + suffix
         json_path = folder / f"{stem}.json"
         srt_path = folder / f"{stem}.srt"
         vtt_path = folder / f"{stem}.vtt"
 
         # SETP 4: Save the result
-        result2json(result, json_path)
-        result2srt(result, srt_path)
-        result2vtt(result, vtt_path)
+        with stage("write"):
+            result2json(result, json_path)
+            result2srt(result, srt_path)
+            result2vtt(result, vtt_path)
         result.update({
             "json_path": str(json_path),
             "srt": str(srt_path),
@@ -217,11 +764,73 @@ class Whisper(WhisperConfig):
 
         return result
 
+    def transcribe_windows(
+        self,
+        audio: Any,
+        tasks: List[str],
+        lang: str,
+        **kwargs,
+    )-> List[Dict]:
+        """Windowed decoding of audio for each task (see `local.decoding.transcribe_windows`)
+
+        Args:
+            audio (np.ndarray): 16 kHz mono float32 audio.
+            tasks (List[str]): 'transcribe' and/or 'translate'.
+            lang (str): Language code, or 'auto' to detect per window.
+            **kwargs: Additional arguments for `transcribe_windows`.
+
+        Returns:
+            List[Dict]: Recognition result per task
+        """
+        options_list = [self.window_options(task, lang) for task in tasks]
+        return transcribe_windows(
+            self.whisper_model,
+            audio,
+            options_list,
+            decode_fn=self.scheduler.decode if self.scheduler is not None else None,
+            **kwargs,
+        )
+
+    def window_options(
+        self,
+        task: str,
+        lang: str,
+        **kwargs,
+    )-> whisper.DecodingOptions:
+        """Decoding options for windowed decoding with timestamps
+
+        Args:
+            task (str): 'transcribe' or 'translate'.
+            lang (str): Language code, or 'auto' to detect per window.
+            **kwargs: Other fields of whisper.DecodingOptions, e.g. prompt.
+        """
+        return replace(
+            self.decoding_options, # type: ignore
+            task=task,
+            language=None if lang == "auto" else lang,
+            without_timestamps=False,
+            **kwargs,
+        )
+
+
+def _artifacts(result: Dict) -> Iterator[Dict]:
+    """Task results (dicts with json/srt/vtt paths) nested in a result"""
+    for value in result.values():
+        if isinstance(value, dict):
+            if "json_path" in value:
+                yield value
+            else:
+                yield from _artifacts(value)
+
 
 def main():
     import json
+    import asyncio
     from local.parser import get_parser
+    from local.batch import collect_media, transcribe_files, print_summary
     args = get_parser().parse_args()
+    if not args.media and not args.manifest:
+        get_parser().error("media or --manifest is required")
 
     # app = Whisper.from_config_yaml(
     #     config_yaml=args.config,
@@ -229,14 +838,30 @@ def main():
 
     app = Whisper(**vars(args))
 
-    result = app(
-        audio_path=args.media,
-        content_id="",
+    # One file: print its result
+    if len(args.media) == 1 and not args.manifest and Path(args.media[0]).is_file():
+        result = app(
+            audio_path=args.media[0],
+            content_id="",
+            out_dir=args.out_dir,
+            task=args.task,
+            lang=args.lang,
+        )
+        print(json.dumps(result, indent=4, ensure_ascii=False))
+        return
+
+    # Many files: load the model once and resume where a previous run stopped
+    stats = asyncio.run(transcribe_files(
+        app,
+        collect_media(args.media, args.manifest),
         out_dir=args.out_dir,
         task=args.task,
         lang=args.lang,
-    )
-    print(json.dumps(result, indent=4, ensure_ascii=False))
+        workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        overwrite=args.overwrite,
+    ))
+    print_summary(stats)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# Find the fastest split of the CPUs into concurrent inference slots
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Saturn2
+from saturn2.backend import configure_executor, shutdown_executor, run_model
+from saturn2.helper.cpu import available_cpus
+from saturn2.media.helper.load_audio import load_audio, SAMPLE_RATE
+
+# Local
+from local.transcribe import Whisper
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Measure throughput at several slots x threads layouts and keep the best',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument('media', type=str, nargs='*', default=['test/test.flac'], help='Audio files to decode')
+    parser.add_argument('--config', type=str, default='conf/config.yaml', help='Path to config file: yaml')
+    parser.add_argument('--kind', type=str, default='process', help='Executor kind: thread / process')
+    parser.add_argument('--layouts', type=str, default='',
+                        help='Comma separated SLOTSxTHREADS, e.g. 1x8,2x4,4x2 (default: every even split)')
+    parser.add_argument('--rounds', type=int, default=2, help='Requests per slot in each measurement')
+    parser.add_argument('--pin-cores', '--pin_cores', dest='pin_cores', action='store_true',
+                        help='Pin every slot to its own CPUs')
+    parser.add_argument('--write', action='store_true', help='Record the best layout in the config file')
+    parser.add_argument('-o', '--output', type=str, default='exp/benchmark/threads.json', help='Output json')
+    return parser
+
+
+def candidate_layouts(cpus: int) -> List[Tuple[int, int]]:
+    """Every (slots, threads) that divides the CPUs evenly"""
+    return [(slots, cpus // slots) for slots in range(1, cpus + 1) if cpus % slots == 0]
+
+
+def parse_layouts(text: str) -> List[Tuple[int, int]]:
+    layouts = []
+    for item in text.split(","):
+        slots, threads = item.lower().split("x")
+        layouts.append((int(slots), int(threads)))
+    return layouts
+
+
+async def measure(
+    model: Whisper,
+    corpus: List[np.ndarray],
+    requests: int,
+)-> float:
+    """Seconds to decode `requests` files at once"""
+    start = time.time()
+    await asyncio.gather(*[
+        run_model(model.decode, corpus[i % len(corpus)], model.task, model.lang)
+        for i in range(requests)
+    ])
+    return time.time() - start
+
+
+def write_layout(config_yaml: str, values: Dict[str, int]) -> None:
+    """Set keys of the `executor` section, keeping the rest of the file as is"""
+    lines = Path(config_yaml).read_text(encoding="utf-8").splitlines()
+    start = next(i for i, line in enumerate(lines) if line.startswith("executor:"))
+    end = next((i for i in range(start + 1, len(lines)) if lines[i] and not lines[i].startswith(" ")), len(lines))
+    for key, value in values.items():
+        pattern = re.compile(rf"^(\s+){key}:.*$")
+        for i in range(start + 1, end):
+            if pattern.match(lines[i]):
+                lines[i] = pattern.sub(rf"\g<1>{key}: {value}", lines[i])
+                break
+        else:
+            lines.insert(end, f"  {key}: {value}")
+            end += 1
+    Path(config_yaml).write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+async def tune(
+    args: argparse.Namespace,
+    model: Whisper,
+    corpus: List[np.ndarray],
+    layouts: List[Tuple[int, int]],
+)-> List[Dict]:
+    """Throughput of every layout"""
+    audio_seconds = [len(audio) / SAMPLE_RATE for audio in corpus]
+    results = []
+    for slots, threads in layouts:
+        configure_executor(
+            kind=args.kind,
+            max_workers=slots,
+            max_inflight=slots,
+            threads_per_worker=threads,
+            pin_cores=args.pin_cores,
+            shared_model=model if args.kind == "process" else None,
+        )
+        requests = slots * max(1, args.rounds)
+        await measure(model, corpus, slots)  # warm up every slot
+        elapsed = await measure(model, corpus, requests)
+        shutdown_executor()
+
+        seconds = sum(audio_seconds[i % len(corpus)] for i in range(requests))
+        results.append({
+            "slots": slots,
+            "threads": threads,
+            "requests": requests,
+            "elapsed": round(elapsed, 3),
+            "files_per_second": round(requests / elapsed, 3),
+            "audio_seconds_per_second": round(seconds / elapsed, 3),
+        })
+        print(json.dumps(results[-1]))
+    return results
+
+
+def main():
+    args = get_parser().parse_args()
+    corpus = [load_audio(name)[0] for name in args.media]
+    model = Whisper.from_config_yaml(args.config, cache={})
+    layouts = parse_layouts(args.layouts) if args.layouts else candidate_layouts(len(available_cpus()))
+
+    results = asyncio.run(tune(args, model, corpus, layouts))
+    best = max(results, key=lambda result: result["audio_seconds_per_second"])
+    report = {"kind": args.kind, "pin_cores": args.pin_cores, "best": best, "results": results}
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(report, indent=4), encoding="utf-8")
+    print(json.dumps(report, indent=4))
+
+    if args.write:
+        write_layout(args.config, {
+            "max_workers": best["slots"],
+            "max_inflight": best["slots"],
+            "threads_per_worker": best["threads"],
+            "pin_cores": str(args.pin_cores).lower(),
+        })
+        print(f"Wrote the best layout to {args.config}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,7 @@
 # Sukbong Kwon (Galois)
 
 import json
-from typing import Text
+from typing import Dict, List, Text, Tuple
 
 def format_timestamp(seconds) -> Text:
     """Convert seconds to SRT timestamp format (HH:MM:SS,ms)"""
@@ -50,4 +50,23 @@ def result2vtt(result, path, start_time=0) -> None:
 def result2json(result, path) -> None:
     """Save JSON format to file"""
     with open(path, "w", encoding="utf-8") as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+def stitch_results(parts: List[Tuple[float, Dict]]) -> Dict:
+    """Merge results of audio chunks, shifting segments by the chunk offsets"""
+    segments = []
+    language = None
+    for offset, result in parts:
+        language = language or result.get("language")
+        for item in result.get("segments", []):
+            segments.append({
+                **item,
+                "id": len(segments),
+                "start": round(offset + item["start"], 3),
+                "end": round(offset + item["end"], 3),
+            })
+    return {
+        "text": "".join(item["text"] for item in segments),
+        "segments": segments,
+        "language": language,
+    }
@@ -11,52 +11,58 @@ nocuda=true
 n_gpu=
 lang=ko
 task=transcribe
+workers=1
+manifest=
 
 
 [ -f ./path.sh ] && . ./path.sh
 . ./utils/parse_options.sh || exit 1;
 
 help_message=(
-"usage: run.sh [options] <audio file>
+"usage: run.sh [options] <audio file|directory|'glob'> ...
 main options:
     --lang <str>        : language code (default=en)
     --model_root <path> : model root directory (default=models/mstudio/speech_recognition/whisper)
     --model_name <path> : model name (default=small.en)
     --out_dir <path>    : output directory (default=exp/whisper)
-    <audio>
+    --workers <int>     : worker processes sharing the model (default=1)
+    --manifest <path>   : file with one audio path per line
+    <audio> ...
 ")
 
-# Check input file
-if [ $# != 1 ]; then
+# Check input files
+if [ $# -lt 1 ] && [ -z "${manifest}" ]; then
   printf "${help_message}\n" 1>&2
   exit 1;
 fi
-audio=$1
+audio=("$@")
 
 # Load 'spinner' function
 . ./utils/spinner.sh
 
-options=""
-if [ ${nocuda} == true ]; then
-  options="--nocuda"
+options=()
+if [ "${nocuda}" == true ]; then
+  options+=(--nocuda)
 fi
 
-[ ! -z ${model_root} ] && options="--model-root ${model_root}"
+[ -n "${model_root}" ] && options+=(--model-root "${model_root}")
+[ -n "${manifest}" ] && options+=(--manifest "${manifest}")
 
 # Set CUDA_VISIBLE_DEVICES
-cuda_visible_devices=""
-if [ ! -z ${n_gpu} ]; then
-  cuda_visible_devices="CUDA_VISIBLE_DEVICES=${n_gpu}"
+env_vars=()
+if [ -n "${n_gpu}" ]; then
+  env_vars+=("CUDA_VISIBLE_DEVICES=${n_gpu}")
 fi
 
-# Run transcribe
-eval "${cuda_visible_devices} python local/transcribe.py \
-    --model-name ${model_name} \
-    ${options} \
-    --lang ${lang} \
-    --out-dir ${out_dir} \
-    --task ${task} \
-    ${audio} &"
+# Run transcribe (globs are expanded by transcribe.py, not the shell)
+env "${env_vars[@]}" python local/transcribe.py \
+    --model-name "${model_name}" \
+    "${options[@]}" \
+    --lang "${lang}" \
+    --out-dir "${out_dir}" \
+    --task "${task}" \
+    --workers "${workers}" \
+    "${audio[@]}" &
 
 colorful_spinner $!
 exit $?
@@ -14,10 +14,26 @@ from .route.batch import (
 
 from .route.text import run_text
 from .route.prompt import run_prompt
-from .route.status import Status, check_status, set_status_path
-from .route.upload import upload_file
-from .route.result import get_result
-from .auth.token import api_token
+from .route.status import (
+    Status,
+    check_status,
+    set_status_path,
+    get_status_path,
+    read_status,
+)
+from .route.upload import upload_file, UploadRejected, UploadLimitMiddleware
+from .route.result import get_result, get_progress
+from .route.executor import (
+    configure_executor,
+    shutdown_executor,
+    executor_stats,
+    run_model,
+    run_local,
+)
+from .route.job import start_job_queue, stop_job_queue, get_job_queue
+from .route.loader import ModelLoader
+from .route.metrics import MetricsMiddleware, metrics_response, observe_cache
+from .auth.token import api_token, ws_api_token
 
 __all__ = [
     "run_batch",
@@ -30,7 +46,25 @@ __all__ = [
     "Status",
     "check_status",
     "set_status_path",
+    "get_status_path",
+    "read_status",
     "get_result",
+    "get_progress",
     "api_token",
+    "ws_api_token",
     "upload_file",
+    "UploadRejected",
+    "UploadLimitMiddleware",
+    "configure_executor",
+    "shutdown_executor",
+    "executor_stats",
+    "run_model",
+    "run_local",
+    "start_job_queue",
+    "stop_job_queue",
+    "get_job_queue",
+    "ModelLoader",
+    "MetricsMiddleware",
+    "metrics_response",
+    "observe_cache",
 ]
\ No newline at end of file
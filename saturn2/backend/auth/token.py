@@ -4,7 +4,7 @@
 # AUTHORS:
 # Sukbong Kwon (Galois)
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, WebSocket, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 API_TOKENS = [
@@ -15,4 +15,18 @@ auth_scheme = HTTPBearer()
 
 async def api_token(credentials: HTTPAuthorizationCredentials = Depends(auth_scheme)):
     if credentials.credentials not in API_TOKENS:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+async def ws_api_token(websocket: WebSocket) -> bool:
+    """Check the token of a WebSocket connection and close it if invalid.
+
+    The token is read from the `Authorization: Bearer` header, or from the
+    `token` query parameter for clients that cannot set headers (browsers).
+    """
+    scheme, _, token = websocket.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer":
+        token = websocket.query_params.get("token", "")
+    if token not in API_TOKENS:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return False
+    return True
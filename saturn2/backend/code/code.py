@@ -91,6 +91,11 @@ class ERROR_SERVER_IS_BUSY(BaseResponse):
     code: int = 503
     message: str = "Server is busy"
 
+@dataclass
+class ERROR_SERVER_IS_NOT_READY(BaseResponse):
+    code: int = 504
+    message: str = "Server is not ready"
+
 @dataclass
 class ERROR_INVALID_ID(BaseResponse):
     code: int = 510
@@ -6,35 +6,67 @@
 
 # Batch processing in the background
 
+import json
+import time
+import hashlib
+import asyncio
+import functools
 from pathlib import Path
-from typing import Dict, Any, Callable, List
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional
 from fastapi import UploadFile
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 # Local
 from .status import Status, set_status_path, update_status
-from .upload import upload_file
+from .upload import upload_file, UploadRejected, ContentHash, HeaderProbe
 from ..code.code import (
     MESSAGE_SUCCESS,
+    MESSAGE_PROCESS_RUNNING,
     ERROR_PROCESS_FAILED,
     ERROR_UPLOAD_FAILED,
+    ERROR_INVALID_AUDIO,
+    ERROR_TASK_NOT_SUPPORTED,
 )
 from .wrapper import json_response_wrapper
+from .executor import run_model, executor_stats
+from .job import Job, get_job_queue
+from .metrics import observe_inference, observe_upload
+from ...helper.timing import StageTimer, current_timer, timed, stage
+from ...media.helper.load_audio import decode_audio_bytes, StreamDecoder
+from ...utils.logs import get_logger
+
+# Define
+logger = get_logger(__name__, level="INFO")
 
 async def run_batch(
     model: Callable[..., Any],
     file: UploadFile,
     content_id: str,
     out_dir: str,
+    background: bool = False,
+    stream: bool = False,
+    ingest: bool = False,
+    max_bytes: int = 0,
+    max_duration: float = 0.0,
     **kwargs,
 )-> Dict:
     """Run batch processing on a single file.
 
+    With `ingest`, the upload is hashed, probed and decoded while it is
+    saved (see `upload_file`), and the model gets `audio_hash` and, unless
+    the job runs in the background, `audio` and `audio_info`. Invalid or
+    too long audio is then rejected before the upload is read to the end.
+
     Args:
         model (Callable): The model to run.
         file (UploadFile): The file to process.
         content_id (str): The content ID.
         out_dir (str): The output directory.
+        background (bool): Queue the job and return its status right away.
+        stream (bool): Stream each segment as soon as it is decoded (NDJSON).
+        ingest (bool): Hash, probe and decode the audio during the upload.
+        max_bytes (int): Reject larger files (0 for no limit).
+        max_duration (float): Reject longer audio in seconds, with `ingest` (0 for no limit).
         **kwargs: Additional arguments for the model.
     Returns:
         Dict: A dictionary containing the status of the processing.
@@ -42,22 +74,45 @@ async def run_batch(
     try:
         content_id, status_path = set_status_path(content_id, out_dir)
 
-        # Upload file
-        file_path = str(Path(status_path).parent / Path(file.filename or "unknown").name)
-        try:
-            await upload_file(file, status_path, file_path)
-        except Exception as e:
-            return ERROR_UPLOAD_FAILED(content={"id": content_id, "detail": str(e)}).asdict()
-
-        # Inference
-        result = await inference(
-            model,
-            file_path,
-            content_id,
-            status_path,
-            **kwargs,
-        )
-        return result
+        with timed():
+            # Upload file; background jobs decode when they run, not in the queue
+            file_path = str(Path(status_path).parent / Path(file.filename or "unknown").name)
+            digest, probe = ContentHash(), HeaderProbe(max_duration)
+            decoder = StreamDecoder() if ingest and not background else None
+            consumers = [digest, probe, *([decoder] if decoder else [])] if ingest else []
+            try:
+                with stage("upload"):
+                    await upload_file(file, status_path, file_path, consumers, max_bytes)
+            except UploadRejected as e:
+                return ERROR_INVALID_AUDIO(content={"id": content_id, "detail": str(e)}).asdict()
+            except Exception as e:
+                return ERROR_UPLOAD_FAILED(content={"id": content_id, "detail": str(e)}).asdict()
+
+            if ingest:
+                kwargs["audio_hash"] = digest.digest
+            if decoder is not None and decoder.result is not None:
+                audio, audio_info = decoder.result
+                if max_duration and audio_info["duration"] > max_duration:
+                    detail = f"Audio is too long ({audio_info['duration']:.1f}s > {max_duration:g}s)"
+                    update_status(status_path, Status.FAILED, detail)
+                    return ERROR_INVALID_AUDIO(content={"id": content_id, "detail": detail}).asdict()
+                kwargs.update(audio=audio, audio_info=audio_info)
+
+            if background:
+                return submit(model, file_path, content_id, status_path, **kwargs)
+
+            if stream:
+                return await inference_stream(model, file_path, content_id, status_path, **kwargs)
+
+            # Inference
+            result = await inference(
+                model,
+                file_path,
+                content_id,
+                status_path,
+                **kwargs,
+            )
+            return result
     except Exception as e:
         update_status(status_path, Status.FAILED, str(e))
         return ERROR_PROCESS_FAILED(content={"id": content_id, "error": str(e)}).asdict()
@@ -67,15 +122,20 @@ async def run_batch_files(
     files: List[UploadFile],
     content_id: str,
     out_dir: str,
+    background: bool = False,
     **kwargs,
 )-> Dict:
     """Run batch processing on multiple files.
 
+    Every file becomes an item with its own content ID, status and result
+    (see `run_items`).
+
     Args:
         model (Callable): The model to run.
         files (List[UploadFile]): List of files to process.
-        content_id (str): The content ID.
+        content_id (str): The content ID of the job.
         out_dir (str): The output directory.
+        background (bool): Queue the job and return its status right away.
         **kwargs: Additional arguments for the model.
 
     Returns:
@@ -83,29 +143,27 @@ async def run_batch_files(
     """
     content_id, status_path = set_status_path(content_id, out_dir)
 
-    # Upload files
-    file_paths = []
-    for file in files:
-        file_path = str(Path(status_path).parent / Path(file.filename or "unknown").name)
+    # Upload files; a failed upload fails its item only
+    items = []
+    for index, file in enumerate(files):
+        item_id, item_status_path = set_status_path(item_content_id(content_id, index), out_dir)
+        file_path = str(Path(item_status_path).parent / Path(file.filename or "unknown").name)
+        item = {"id": item_id, "file": file_path, "status_path": item_status_path}
         try:
-            await upload_file(file, status_path, file_path)
-            file_paths.append(file_path)
+            await upload_file(file, item_status_path, file_path)
         except Exception as e:
-            return ERROR_UPLOAD_FAILED(content={"id": content_id, "detail": str(e)}).asdict()
+            item["error"] = str(e)
+        items.append(item)
 
-    return await inference(
-        model,
-        file_paths,
-        content_id,
-        status_path,
-        **kwargs
-    )
+    return await run_items(model, items, content_id, status_path, background, **kwargs)
 
 async def run_batch_uri(
     model: Callable[..., Any],
     file_path: str,
     content_id: str,
     out_dir: str,
+    background: bool = False,
+    stream: bool = False,
     **kwargs,
 )-> Dict:
     """Run batch processing on a single URI.
@@ -115,6 +173,8 @@ async def run_batch_uri(
         file_path (str): The path to the input file.
         content_id (str): The content ID.
         out_dir (str): The output directory.
+        background (bool): Queue the job and return its status right away.
+        stream (bool): Stream each segment as soon as it is decoded (NDJSON).
         **kwargs: Additional arguments for the model.
 
     Returns:
@@ -122,6 +182,12 @@ async def run_batch_uri(
     """
     content_id, status_path = set_status_path(content_id, out_dir)
 
+    if background:
+        return submit(model, file_path, content_id, status_path, **kwargs)
+
+    if stream:
+        return await inference_stream(model, file_path, content_id, status_path, **kwargs)
+
     return await inference(
         model,
         file_path,
@@ -135,15 +201,20 @@ async def run_batch_uris(
     file_paths: List[str],
     content_id: str,
     out_dir: str,
+    background: bool = False,
     **kwargs,
 )-> Dict:
     """Run batch processing on multiple URIs.
 
+    Every URI becomes an item with its own content ID, status and result
+    (see `run_items`).
+
     Args:
         model (Callable): The model to run.
         file_paths (List[str]): List of file paths to process.
-        content_id (str): The content ID.
+        content_id (str): The content ID of the job.
         out_dir (str): The output directory.
+        background (bool): Queue the job and return its status right away.
         **kwargs: Additional arguments for the model.
 
     Returns:
@@ -151,13 +222,12 @@ async def run_batch_uris(
     """
     content_id, status_path = set_status_path(content_id, out_dir)
 
-    return await inference(
-        model,
-        file_paths,
-        content_id,
-        status_path,
-        **kwargs
-    )
+    items = []
+    for index, file_path in enumerate(file_paths):
+        item_id, item_status_path = set_status_path(item_content_id(content_id, index), out_dir)
+        items.append({"id": item_id, "file": file_path, "status_path": item_status_path})
+
+    return await run_items(model, items, content_id, status_path, background, **kwargs)
 
 async def run_batch_bytes(
     model: Callable[..., Any],
@@ -165,15 +235,26 @@ async def run_batch_bytes(
     content_type: str,
     content_id: str,
     out_dir: str,
+    background: bool = False,
+    in_memory: bool = False,
     **kwargs,
 )-> Dict:
     """Run batch processing on a base64 encoded string.
 
+    With `in_memory`, the bytes are decoded here without touching the disk
+    (see `decode_audio_bytes`) and the model gets `audio`, `audio_info` and
+    `audio_hash`; the file path only names its outputs. Background jobs
+    always save the bytes, so the queue does not hold decoded audio.
+
     Args:
         model (Callable): The model to run.
         data (str): The base64 encoded string.
+        content_type (str): Content type of the data, e.g. audio/wav or audio/L16; rate=16000.
         content_id (str): The content ID.
         out_dir (str): The output directory.
+        background (bool): Queue the job and return its status right away.
+        in_memory (bool): Decode the audio in memory instead of saving it to a file
+            (ignored with `background`).
         **kwargs: Additional arguments for the model.
 
     Returns:
@@ -183,32 +264,276 @@ async def run_batch_bytes(
     content_id, status_path = set_status_path(content_id, out_dir)
 
     # Get file suffix from content type
-    suffix = content_type.split("/")[-1]
+    suffix = content_type.split(";")[0].split("/")[-1].strip() or "bin"
 
     # Save to data to speech file
     file_path = str(Path(status_path).with_suffix(f".{suffix}"))
 
-    # Read raw bytes and save to file
-    try:
-        Path(file_path).write_bytes(data)
-    except Exception as e:
-        return ERROR_UPLOAD_FAILED(content={"id": content_id, "detail": str(e)}).asdict()
+    with timed():
+        observe_upload(len(data), "bytes")
+        kwargs["audio_hash"] = hashlib.sha256(data).hexdigest()
+        if in_memory and not background:
+            # Decode the bytes (ffmpeg on stdin, or directly for PCM/WAV)
+            try:
+                with stage("decode_bytes"):
+                    audio, audio_info = await asyncio.to_thread(decode_audio_bytes, data, content_type)
+            except Exception as e:
+                update_status(status_path, Status.FAILED, str(e))
+                return ERROR_PROCESS_FAILED(content={"id": content_id, "error": str(e)}).asdict()
+            kwargs.update(audio=audio, audio_info=audio_info)
+        else:
+            # Read raw bytes and save to file
+            try:
+                with stage("upload"):
+                    Path(file_path).write_bytes(data)
+            except Exception as e:
+                return ERROR_UPLOAD_FAILED(content={"id": content_id, "detail": str(e)}).asdict()
+
+        logger.debug(f"Run batch bytes: {file_path}")
+
+        if background:
+            return submit(model, file_path, content_id, status_path, **kwargs)
+
+        return await inference(
+            model,
+            file_path,
+            content_id,
+            status_path,
+            **kwargs
+        )
 
-    print (f"Run batch bytes: {file_path}")
 
-    return await inference(
-        model,
-        file_path,
-        content_id,
-        status_path,
-        **kwargs
+def submit(
+    model: Callable[..., Any],
+    file_path: str,
+    content_id: str,
+    status_path: str,
+    **kwargs,
+)-> Dict:
+    """Queue inference on the job queue and return the PENDING status.
+
+    Args:
+        model (Callable): The model to run.
+        file_path (str): The path to the input file.
+        content_id (str): The content ID.
+        status_path (str): The path to the status file.
+        **kwargs: Additional arguments for the model.
+
+    Returns:
+        Dict: A dictionary containing the status of the job.
+    """
+    # The job runs outside this request; its timing includes the queue wait
+    job = Job(
+        content_id=content_id,
+        status_path=status_path,
+        run=functools.partial(
+            process,
+            model,
+            file_path,
+            content_id,
+            status_path,
+            timer=current_timer(),
+            **kwargs,
+        ),
     )
+    return get_job_queue().submit(job)
+
+
+def item_content_id(content_id: str, index: int) -> str:
+    """Content ID of the index-th file of a multi-file job"""
+    return f"{content_id}-{index:04d}"
+
+
+def items_path(status_path: str) -> Path:
+    """Item list of a multi-file job, next to its status file"""
+    return Path(status_path).with_suffix(".items.json")
+
+
+async def run_items(
+    model: Callable[..., Any],
+    items: List[Dict],
+    content_id: str,
+    status_path: str,
+    background: bool = False,
+    **kwargs,
+)-> Dict:
+    """Run a multi-file job now, or queue it as one background job.
+
+    Each item is a content of its own (`<content_id>-0000`, ...) with its
+    status and result, so `check_status`/`get_result` work per file. The
+    item list is saved next to the job status for `get_progress`.
+
+    Args:
+        model (Callable): The model to run.
+        items (List[Dict]): {"id", "file", "status_path"} per file, with
+            "error" for files that failed before processing.
+        content_id (str): The content ID of the job.
+        status_path (str): The path to the status file of the job.
+        background (bool): Queue the job and return its status right away.
+        **kwargs: Additional arguments for the model.
+
+    Returns:
+        Dict: The job summary, or its PENDING status with `background`.
+    """
+    items_path(status_path).write_text(
+        json.dumps([{"id": item["id"], "file": item["file"]} for item in items], ensure_ascii=False),
+        encoding="utf-8",
+    )
+
+    if not background:
+        return await process_items(model, items, content_id, status_path, **kwargs)
+
+    for item in items:
+        if "error" not in item:
+            update_status(item["status_path"], Status.PENDING, f"{content_id} queued")
+    job = Job(
+        content_id=content_id,
+        status_path=status_path,
+        run=functools.partial(process_items, model, items, content_id, status_path, **kwargs),
+        item_status_paths=[item["status_path"] for item in items if "error" not in item],
+    )
+    return get_job_queue().submit(job)
+
+
+async def process_items(
+    model: Callable[..., Any],
+    items: List[Dict],
+    content_id: str,
+    status_path: str,
+    **kwargs,
+)-> Dict:
+    """Process every item of a multi-file job concurrently.
+
+    Items share the executor with other requests: at most `max_inflight`
+    run at once, and their windows are batched together when batching is
+    enabled. The job status reads "<done>/<total> done" while running.
+
+    Args:
+        model (Callable): The model to run.
+        items (List[Dict]): Items of the job (see `run_items`).
+        content_id (str): The content ID of the job.
+        status_path (str): The path to the status file of the job.
+        **kwargs: Additional arguments for the model.
+
+    Returns:
+        Dict: MESSAGE_SUCCESS with the progress and every item's status and result.
+    """
+    total = len(items)
+    summaries: List[Dict] = []
+    update_status(status_path, Status.RUNNING, f"0/{total} done")
+
+    async def run_item(item: Dict) -> Dict:
+        summary = {"id": item["id"], "file": Path(item["file"]).name}
+        if "error" in item:
+            summary.update({"status": Status.FAILED.value, "error": item["error"]})
+        else:
+            try:
+                response = await process(
+                    model,
+                    item["file"],
+                    item["id"],
+                    item["status_path"],
+                    timer=StageTimer(),
+                    **kwargs,
+                )
+                summary.update({"status": Status.DONE.value, "result": response["content"]["result"]})
+            except Exception as e:
+                summary.update({"status": Status.FAILED.value, "error": str(e)})
+        summaries.append(summary)
+        done = sum(1 for entry in summaries if entry["status"] == Status.DONE.value)
+        update_status(status_path, Status.RUNNING, f"{done}/{total} done")
+        return summary
+
+    results = await asyncio.gather(*[run_item(item) for item in items])
+
+    done = sum(1 for entry in results if entry["status"] == Status.DONE.value)
+    response = MESSAGE_SUCCESS(content={
+        "id": content_id,
+        "result": {
+            "progress": f"{done}/{total} done",
+            "total": total,
+            "done": done,
+            "failed": total - done,
+            "items": results,
+        },
+    }).asdict()
+
+    # Save the response and update status to DONE
+    result_path = Path(status_path).with_suffix(".json")
+    result_path.write_text(json.dumps(response, ensure_ascii=False), encoding="utf-8")
+    update_status(status_path, Status.DONE, str(result_path))
+    return response
+
+
+async def inference_stream(
+    model: Callable[..., Any],
+    file_path: str,
+    content_id: str,
+    status_path: str,
+    **kwargs,
+)-> StreamingResponse:
+    """Run inference and stream the segments as NDJSON lines.
+
+    The model is called with an `on_segment` callback. Each segment is sent
+    as a MESSAGE_PROCESS_RUNNING line as soon as it is decoded, and the last
+    line carries the same payload as `inference` (MESSAGE_SUCCESS or
+    ERROR_PROCESS_FAILED).
+
+    Args:
+        model (Callable): The model to run. Must accept `on_segment`.
+        file_path (str): The path to the input file.
+        content_id (str): The content ID.
+        status_path (str): The path to the status file.
+        **kwargs: Additional arguments for the model.
+
+    Returns:
+        StreamingResponse: application/x-ndjson response.
+    """
+    # The callback cannot be sent to process workers
+    if executor_stats()["kind"] == "process":
+        return JSONResponse(
+            ERROR_TASK_NOT_SUPPORTED(
+                content={"id": content_id, "detail": "Streaming requires the thread executor"}
+            ).asdict()
+        )
+
+    loop = asyncio.get_running_loop()
+    segments: asyncio.Queue = asyncio.Queue()
+
+    def on_segment(segment: Dict) -> None:
+        # Called from the executor thread
+        loop.call_soon_threadsafe(segments.put_nowait, segment)
+
+    async def run() -> Dict:
+        try:
+            return await process(
+                model,
+                file_path,
+                content_id,
+                status_path,
+                on_segment=on_segment,
+                **kwargs,
+            )
+        except Exception as e:
+            return ERROR_PROCESS_FAILED(content={"id": content_id, "error": str(e)}).asdict()
+        finally:
+            segments.put_nowait(None)
+
+    task = asyncio.create_task(run())
+
+    async def lines() -> AsyncIterator[str]:
+        while (segment := await segments.get()) is not None:
+            message = MESSAGE_PROCESS_RUNNING(content={"id": content_id, "segment": segment})
+            yield json.dumps(message.asdict(), ensure_ascii=False) + "\n"
+        yield json.dumps(await task, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @json_response_wrapper
 async def inference(
     model: Callable[..., Any],
-    file_path: str | List[str],
+    file_path: str,
     content_id: str,
     status_path: str,
     **kwargs,
@@ -224,18 +549,76 @@ async def inference(
     Returns:
         Dict: A dictionary containing the status of the inference.
     """
-    detail = file_path if isinstance(file_path, str) else ','.join(file_path)
+    return await process(
+        model,
+        file_path,
+        content_id,
+        status_path,
+        **kwargs,
+    )
+
+
+async def process(
+    model: Callable[..., Any],
+    file_path: str,
+    content_id: str,
+    status_path: str,
+    timer: Optional[StageTimer] = None,
+    **kwargs,
+)-> Dict:
+    """Run the model, save the response next to the status file and update the status.
 
-    # Update status to RUNNING
-    update_status(status_path, Status.RUNNING, detail)
+    The DONE status points to the saved response so that `get_result`
+    can serve it later. The response has the route stages (upload,
+    inference) under 'timing'; the model stages are in the result.
 
-    # Inference with the model
-    out_dir = str(Path(status_path).parent)
-    result = model(file_path, out_dir=out_dir, content_id=content_id, **kwargs)
+    Args:
+        model (Callable): The model to run.
+        file_path (str): The path to the input file.
+        content_id (str): The content ID.
+        status_path (str): The path to the status file.
+        timer (StageTimer, optional): Timer of the request. Defaults to the
+            timer of the current context, or a new one.
+        **kwargs: Additional arguments for the model.
 
-    # Update status to DONE
-    update_status(status_path, Status.DONE, detail)
+    Returns:
+        Dict: A dictionary containing the status of the inference.
+    """
+    timer = timer or current_timer() or StageTimer()
 
-    # Return the result
-    return MESSAGE_SUCCESS(content={"id": content_id, "result": result}).asdict()
+    try:
+        # Update status to RUNNING
+        update_status(status_path, Status.RUNNING, file_path)
+
+        # Inference with the model
+        out_dir = str(Path(status_path).parent)
+        start = time.perf_counter()
+        with timer.stage("inference"):
+            result = await run_model(
+                model,
+                file_path,
+                out_dir=out_dir,
+                content_id=content_id,
+                **kwargs,
+            )
+        observe_inference(
+            result,
+            time.perf_counter() - start,
+            model=kwargs.get("model_name") or getattr(model, "default", ""),
+            task=kwargs.get("task", ""),
+        )
+        duration = result.get("audio_info", {}).get("duration", 0) if isinstance(result, dict) else 0
+        response = MESSAGE_SUCCESS(
+            content={"id": content_id, "result": result, "timing": timer.report(duration)}
+        ).asdict()
+
+        # Save the response and update status to DONE
+        result_path = Path(status_path).with_suffix(".json")
+        result_path.write_text(json.dumps(response, ensure_ascii=False), encoding="utf-8")
+        update_status(status_path, Status.DONE, str(result_path))
+    except Exception as e:
+        update_status(status_path, Status.FAILED, str(e))
+        raise
 
+    # Return the result
+    return response
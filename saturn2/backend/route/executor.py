@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# Run blocking model calls off the event loop
+
+import asyncio
+import functools
+import gc
+import inspect
+import multiprocessing
+import queue
+from contextlib import asynccontextmanager
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+from ...helper.cpu import partition_cores, limit_threads
+
+# Executor state (shared by every route helper)
+_executor: Optional[Executor] = None
+_kind: str = "thread"
+_max_workers: int = 1
+_max_inflight: int = 1
+_semaphore: Optional[asyncio.Semaphore] = None
+_inflight: int = 0
+_waiting: int = 0
+_layout: List[List[int]] = []
+_pin_cores: bool = False
+
+# Model owned by a process worker and the thread running it (set by the pool initializer)
+_worker_model: Any = None
+_worker_thread: Optional[ThreadPoolExecutor] = None
+
+
+def configure_executor(
+    kind: str = "thread",
+    max_workers: int = 1,
+    max_inflight: int = 0,
+    model_factory: Optional[Callable[..., Any]] = None,
+    factory_args: Sequence[Any] = (),
+    shared_model: Any = None,
+    threads_per_worker: int = 0,
+    pin_cores: bool = False,
+)-> None:
+    """Create the executor used to dispatch model calls.
+
+    With `shared_model`, process workers are forked from this process and
+    use the already loaded model: its weights stay in copy-on-write pages
+    shared by every worker instead of being loaded once per worker.
+
+    The CPUs are split into one disjoint set per worker. Each worker limits
+    its torch intra-op threads to the size of its set (and, with
+    `pin_cores`, runs only on those CPUs), so concurrent calls do not
+    oversubscribe the cores.
+
+    Args:
+        kind (str): 'thread' or 'process'.
+        max_workers (int): Number of workers in the pool.
+        max_inflight (int): Maximum number of model calls submitted at once.
+            Defaults to max_workers when 0.
+        model_factory (Callable, optional): Builds the model in each process worker.
+            Required when kind is 'process' and no shared_model is given.
+        factory_args (Sequence): Arguments for model_factory.
+        shared_model (Any, optional): Loaded model inherited by forked process workers.
+        threads_per_worker (int): CPUs per worker (0 to divide all CPUs evenly).
+        pin_cores (bool): Set the CPU affinity of each worker to its CPUs.
+    """
+    global _executor, _kind, _max_workers, _max_inflight, _semaphore, _layout, _pin_cores
+
+    if kind not in ("thread", "process"):
+        raise ValueError(f"Unknown executor kind: {kind}")
+    if kind == "process" and model_factory is None and shared_model is None:
+        raise ValueError("model_factory or shared_model is required for the process executor")
+
+    shutdown_executor()
+
+    _kind = kind
+    _max_workers = max(1, int(max_workers))
+    _max_inflight = max(1, int(max_inflight or _max_workers))
+    _semaphore = asyncio.Semaphore(_max_inflight)
+    _layout = partition_cores(_max_workers, int(threads_per_worker))
+    _pin_cores = bool(pin_cores)
+
+    if kind == "process":
+        # Forked workers inherit the loaded model
+        context = multiprocessing.get_context("fork") if shared_model is not None else None
+        slots = (context or multiprocessing).SimpleQueue()
+        for cores in _layout:
+            slots.put(cores)
+        if shared_model is not None:
+            # Objects created so far are never collected in the workers, so the
+            # garbage collector does not write to (and copy) the shared pages
+            gc.freeze()
+        _executor = ProcessPoolExecutor(
+            max_workers=_max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(slots, _pin_cores, model_factory, tuple(factory_args), shared_model),
+        )
+        if shared_model is not None:
+            # The first call forks every worker, before request threads hold any lock
+            _executor.submit(int).result()
+            gc.unfreeze()
+    else:
+        slots = queue.SimpleQueue()
+        for cores in _layout:
+            slots.put(cores)
+        _executor = ThreadPoolExecutor(
+            max_workers=_max_workers,
+            thread_name_prefix="saturn2-model",
+            initializer=_init_worker,
+            initargs=(slots, _pin_cores),
+        )
+
+
+def shutdown_executor() -> None:
+    """Shut down the executor, waiting for running calls to finish.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+def executor_stats() -> Dict[str, Any]:
+    """Return the executor configuration and the current load.
+    """
+    return {
+        "kind": _kind,
+        "max_workers": _max_workers,
+        "max_inflight": _max_inflight,
+        "cores": _layout,
+        "pin_cores": _pin_cores,
+        "inflight": _inflight,
+        "waiting": _waiting,
+    }
+
+
+async def run_model(
+    model: Callable[..., Any],
+    *args: Any,
+    **kwargs: Any,
+)-> Any:
+    """Call the model without blocking the event loop.
+
+    Coroutine models are awaited directly. Synchronous models run in the
+    configured executor; calls over the in-flight limit wait their turn.
+    With the process executor, the worker's own model is called instead:
+    `model` itself, or the method of the same name when `model` is a bound
+    method (e.g. `model.detect_language`).
+
+    Args:
+        model (Callable): The model to run.
+        *args: Positional arguments for the model.
+        **kwargs: Keyword arguments for the model.
+
+    Returns:
+        Any: The model output.
+    """
+    if _is_coroutine_model(model):
+        return await model(*args, **kwargs)
+
+    if _executor is None:
+        configure_executor()
+
+    if _kind == "process":
+        method = model.__name__ if inspect.ismethod(model) else "__call__"
+        call = functools.partial(_call_worker_model, method, *args, **kwargs)
+    else:
+        call = functools.partial(model, *args, **kwargs)
+
+    async with _slot():
+        loop = asyncio.get_running_loop()
+        raw = await loop.run_in_executor(_executor, call)
+
+    if inspect.isawaitable(raw):
+        raw = await raw
+    return raw
+
+
+async def run_local(
+    fn: Callable[..., Any],
+    *args: Any,
+    **kwargs: Any,
+)-> Any:
+    """Run a blocking call that must stay in this process, under the in-flight limit.
+
+    For work whose state lives here (e.g. a streaming session buffer).
+    It counts against the same in-flight limit as `run_model`. With the
+    thread executor, it also runs on a model thread, so the slot's CPU
+    limits apply. Beside process workers it runs on a plain thread.
+
+    Args:
+        fn (Callable): Blocking function.
+        *args: Positional arguments for fn.
+        **kwargs: Keyword arguments for fn.
+
+    Returns:
+        Any: The result of fn.
+    """
+    if _executor is None:
+        configure_executor()
+
+    async with _slot():
+        loop = asyncio.get_running_loop()
+        executor = _executor if _kind == "thread" else None
+        return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+
+@asynccontextmanager
+async def _slot() -> AsyncIterator[None]:
+    """Wait for an in-flight slot and hold it (counted as waiting, then in flight)"""
+    global _inflight, _waiting
+
+    _waiting += 1
+    try:
+        await _semaphore.acquire()  # type: ignore
+    finally:
+        _waiting -= 1
+
+    _inflight += 1
+    try:
+        yield
+    finally:
+        _inflight -= 1
+        _semaphore.release()  # type: ignore
+
+
+def _is_coroutine_model(model: Callable[..., Any]) -> bool:
+    return inspect.iscoroutinefunction(model) or inspect.iscoroutinefunction(
+        getattr(model, "__call__", None)
+    )
+
+
+def _init_worker(
+    slots: Any,
+    pin_cores: bool,
+    model_factory: Optional[Callable[..., Any]] = None,
+    factory_args: Sequence[Any] = (),
+    shared_model: Any = None,
+)-> None:
+    """Limit the worker to its CPUs, then set up its model (process workers).
+    """
+    global _worker_model, _worker_thread
+    cores = slots.get()
+    if model_factory is None and shared_model is None:
+        limit_threads(cores, pin_cores)
+        return
+
+    # Process workers run the model in their own thread: the OpenMP thread
+    # pool of a forked main thread is unusable (it hangs on first use)
+    _worker_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="saturn2-worker")
+    _worker_thread.submit(limit_threads, cores, pin_cores).result()
+    if shared_model is not None:
+        _worker_model = shared_model
+    else:
+        _worker_model = _worker_thread.submit(model_factory, *factory_args).result()
+
+
+def _call_worker_model(method: str, *args: Any, **kwargs: Any) -> Any:
+    call = getattr(_worker_model, method)
+    return _worker_thread.submit(call, *args, **kwargs).result()  # type: ignore
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# Job queue for processing in the background
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .status import Status, check_status, read_status, update_status
+from ..code.code import ERROR_SERVER_IS_BUSY
+
+
+@dataclass
+class Job:
+    """A queued unit of work and the status file it reports to.
+    """
+    content_id: str
+    status_path: str
+    run: Callable[[], Awaitable[Any]]
+    # Status files of the items of a multi-file job
+    item_status_paths: List[str] = field(default_factory=list)
+
+    def fail(self, detail: str) -> None:
+        """Mark the job and its unfinished items FAILED.
+        """
+        update_status(self.status_path, Status.FAILED, detail)
+        for path in self.item_status_paths:
+            try:
+                status, _ = read_status(path)
+            except (OSError, ValueError):
+                continue
+            if status not in (Status.DONE, Status.FAILED):
+                update_status(path, Status.FAILED, detail)
+
+
+@dataclass
+class JobQueue:
+    """Queue drained by a fixed number of background workers.
+
+    Jobs go through PENDING (queued), WAITING (picked up by a worker) and
+    the states set by the job itself (RUNNING, DONE or FAILED).
+    """
+    num_workers: int = 1
+    max_size: int = 0
+    queue: asyncio.Queue = field(init=False)
+    workers: List[asyncio.Task] = field(default_factory=list, init=False)
+
+    def __post_init__(self):
+        self.queue = asyncio.Queue(maxsize=self.max_size)
+
+    def start(self) -> None:
+        """Start the workers (must be called inside the running event loop).
+        """
+        for i in range(max(1, self.num_workers)):
+            self.workers.append(asyncio.create_task(self._worker(), name=f"job-worker-{i}"))
+
+    async def stop(self) -> None:
+        """Cancel the workers. Running jobs and jobs left in the queue are
+        marked FAILED, so their status does not stay PENDING.
+        """
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers.clear()
+
+        while not self.queue.empty():
+            job = self.queue.get_nowait()
+            job.fail("Server shut down before the job started")
+            self.queue.task_done()
+
+    def submit(self, job: Job) -> Dict:
+        """Enqueue a job and return its PENDING status right away.
+
+        Returns:
+            Dict: PENDING status, or ERROR_SERVER_IS_BUSY if the queue is full.
+        """
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            update_status(job.status_path, Status.FAILED, "Job queue is full")
+            return ERROR_SERVER_IS_BUSY(
+                content={"id": job.content_id, "detail": "Job queue is full"}
+            ).asdict()
+
+        update_status(job.status_path, Status.PENDING, f"{job.content_id} queued")
+        return check_status(job.content_id, Status.PENDING)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of queued jobs and workers.
+        """
+        return {
+            "queued": self.queue.qsize(),
+            "workers": len(self.workers),
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self.queue.get()
+            try:
+                update_status(job.status_path, Status.WAITING, f"{job.content_id} waiting")
+                await job.run()
+            except asyncio.CancelledError:
+                job.fail("Server shut down while the job was running")
+                raise
+            except Exception as e:
+                update_status(job.status_path, Status.FAILED, str(e))
+            finally:
+                self.queue.task_done()
+
+
+# Job queue shared by every route helper
+_job_queue: Optional[JobQueue] = None
+
+
+def start_job_queue(
+    num_workers: int = 1,
+    max_size: int = 0,
+)-> JobQueue:
+    """Create and start the shared job queue.
+
+    Args:
+        num_workers (int): Number of background workers.
+        max_size (int): Maximum number of queued jobs (0 for unbounded).
+    Returns:
+        JobQueue: The started job queue.
+    """
+    global _job_queue
+    _job_queue = JobQueue(num_workers=num_workers, max_size=max_size)
+    _job_queue.start()
+    return _job_queue
+
+
+async def stop_job_queue() -> None:
+    """Stop the shared job queue.
+    """
+    global _job_queue
+    if _job_queue is not None:
+        await _job_queue.stop()
+        _job_queue = None
+
+
+def get_job_queue() -> JobQueue:
+    """Return the shared job queue.
+
+    Raises:
+        RuntimeError: If the job queue has not been started.
+    """
+    if _job_queue is None:
+        raise RuntimeError("Job queue is not started")
+    return _job_queue
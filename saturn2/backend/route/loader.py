@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# Load the model in the background while the app already answers
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from ..code.code import ERROR_SERVER_IS_NOT_READY
+from ...utils.logs import get_logger
+
+# Define
+logger = get_logger(__name__, level="INFO")
+
+
+class ModelLoader:
+    """Loads the model on a background thread and tracks its progress.
+
+    States: idle -> loading -> ready, or failed. Routes that need the model
+    depend on `get`, which answers 503 until the model is ready.
+    """
+    def __init__(self) -> None:
+        self.state = "idle"
+        self.stage = ""
+        self.error = ""
+        self.started = 0.0
+        self.finished = 0.0
+        self.model: Any = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, load: Callable[["ModelLoader"], Any], background: bool = True) -> None:
+        """Run `load(loader)` on a background thread; its return value is the model.
+
+        Args:
+            load (Callable): Loads and returns the model. May call `progress`.
+            background (bool): Load on a background thread. Pass False when the
+                loader forks processes, which must happen before serving starts.
+        """
+        with self._lock:
+            if self.state != "idle":
+                return
+            self.state = "loading"
+            self.started = time.time()
+        if not background:
+            self._run(load)
+            return
+        self._thread = threading.Thread(target=self._run, args=(load,), name="saturn2-loader", daemon=True)
+        self._thread.start()
+
+    def progress(self, stage: str) -> None:
+        """Report the current loading stage.
+        """
+        with self._lock:
+            self.stage = stage
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def status(self) -> Dict[str, Any]:
+        """State, stage and elapsed loading time.
+        """
+        with self._lock:
+            end = self.finished or time.time()
+            return {
+                "state": self.state,
+                "stage": self.stage,
+                "error": self.error,
+                "elapsed": round(end - self.started, 3) if self.started else 0.0,
+            }
+
+    def get(self) -> Any:
+        """Return the model (FastAPI dependency).
+
+        Raises:
+            HTTPException: 503 with ERROR_SERVER_IS_NOT_READY while the model
+                is not loaded.
+        """
+        if not self.ready:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=ERROR_SERVER_IS_NOT_READY(content=self.status()).asdict(),
+                headers={"Retry-After": "5"},
+            )
+        return self.model
+
+    def _run(self, load: Callable[["ModelLoader"], Any]) -> None:
+        try:
+            model = load(self)
+        except Exception as e:
+            logger.exception("Model loading failed")
+            with self._lock:
+                self.state = "failed"
+                self.error = str(e)
+                self.finished = time.time()
+            return
+
+        with self._lock:
+            self.model = model
+            self.state = "ready"
+            self.stage = ""
+            self.finished = time.time()
+        logger.info(f"Model ready in {self.finished - self.started:.2f}s")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# Prometheus metrics for throughput, latency and real-time factor
+
+import time
+from typing import Any, Dict
+
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from .executor import executor_stats
+
+# Seconds: from fast status calls to long transcriptions
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+RTF_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5)
+
+REQUESTS = Counter(
+    "saturn2_requests_total",
+    "HTTP requests by endpoint, method and status code",
+    ["endpoint", "method", "code"],
+)
+REQUEST_SECONDS = Histogram(
+    "saturn2_request_seconds",
+    "HTTP request latency by endpoint",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+QUEUE_DEPTH = Gauge(
+    "saturn2_queue_depth",
+    "Background jobs waiting in the job queue",
+)
+INFLIGHT = Gauge(
+    "saturn2_inflight_calls",
+    "Model calls running in the executor",
+)
+WAITING = Gauge(
+    "saturn2_waiting_calls",
+    "Model calls waiting for an executor slot",
+)
+AUDIO_SECONDS = Counter(
+    "saturn2_audio_seconds_total",
+    "Seconds of audio processed",
+    ["model", "task"],
+)
+PROCESSING_SECONDS = Counter(
+    "saturn2_processing_seconds_total",
+    "Seconds spent processing audio",
+    ["model", "task"],
+)
+RTF = Histogram(
+    "saturn2_real_time_factor",
+    "Processing time divided by audio duration",
+    ["model", "task"],
+    buckets=RTF_BUCKETS,
+)
+UPLOAD_BYTES = Counter(
+    "saturn2_upload_bytes_total",
+    "Bytes received as uploads or request bodies",
+    ["source"],
+)
+CACHE_EVENTS = Counter(
+    "saturn2_cache_events_total",
+    "Cache lookups and evictions by cache and event (hit, miss, eviction)",
+    ["cache", "event"],
+)
+STATUS = Counter(
+    "saturn2_status_total",
+    "Status updates of processed content (FAILED counts the failures)",
+    ["status"],
+)
+
+
+def _queue_depth() -> int:
+    from . import job  # job -> status -> metrics
+    return job._job_queue.queue.qsize() if job._job_queue is not None else 0
+
+
+QUEUE_DEPTH.set_function(_queue_depth)
+INFLIGHT.set_function(lambda: executor_stats()["inflight"])
+WAITING.set_function(lambda: executor_stats()["waiting"])
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and their latency per endpoint.
+
+    The endpoint label is the route template (e.g. /whisper/v1/run), so
+    path parameters do not create new series.
+    """
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        code = 500
+
+        async def send_status(message: Dict) -> None:
+            nonlocal code
+            if message["type"] == "http.response.start":
+                code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            route = scope.get("route")
+            endpoint = getattr(route, "path", "unmatched")
+            REQUESTS.labels(endpoint, scope["method"], str(code)).inc()
+            REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - start)
+
+
+def metrics_response() -> Response:
+    """Current metrics in the Prometheus text format.
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def observe_inference(
+    result: Any,
+    elapsed: float,
+    model: str = "",
+    task: str = "",
+)-> None:
+    """Record the audio duration, processing time and real-time factor of a model call.
+
+    Args:
+        result (Any): Model output; the duration is read from `audio_info.duration`.
+        elapsed (float): Processing time in seconds.
+        model (str): Model name ("default" when empty).
+        task (str): Task name ("default" when empty).
+    """
+    labels = (model or "default", task or "default")
+    PROCESSING_SECONDS.labels(*labels).inc(elapsed)
+
+    duration = result.get("audio_info", {}).get("duration", 0) if isinstance(result, dict) else 0
+    if duration:
+        AUDIO_SECONDS.labels(*labels).inc(duration)
+        RTF.labels(*labels).observe(elapsed / duration)
+
+
+def observe_upload(size: int, source: str) -> None:
+    """Record received bytes (source: 'upload' or 'bytes').
+    """
+    UPLOAD_BYTES.labels(source).inc(size)
+
+
+def observe_cache(cache: str, event: str) -> None:
+    """Record a cache event (event: 'hit', 'miss' or 'eviction').
+    """
+    CACHE_EVENTS.labels(cache, event).inc()
+
+
+def observe_status(status: Any) -> None:
+    """Record a status update (a `Status`).
+    """
+    STATUS.labels(status.value).inc()
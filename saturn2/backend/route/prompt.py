@@ -4,11 +4,11 @@
 # AUTHORS:
 # Sukbong Kwon (Galois)
 
-import inspect
 from typing import Any, Callable
 from fastapi.responses import JSONResponse
 
 from ..code.code import MESSAGE_SUCCESS, ERROR_PROCESS_FAILED
+from .executor import run_model
 
 
 async def run_prompt(
@@ -25,14 +25,13 @@ async def run_prompt(
     'prompt' in kwargs.
     """
     try:
-        # Invoke the model (await if it's a coroutine, otherwise use directly)
-        raw = model(
+        # Invoke the model (await if it's a coroutine, otherwise run in the executor)
+        raw = await run_model(
+            model,
             out_dir=out_dir,
             content_id=content_id,
             **kwargs,
         )
-        if inspect.isawaitable(raw):
-            raw = await raw
 
         # Build the success payload
         payload = MESSAGE_SUCCESS(
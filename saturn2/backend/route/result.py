@@ -4,10 +4,11 @@
 # AUTHORS:
 # Sukbong Kwon (Galois)
 
+import json
 from pathlib import Path
 from typing import Dict, Any
 
-from .status import Status, check_status
+from .status import Status, check_status, get_status_path, read_status
 from ..code.code import (
     MESSAGE_SUCCESS,
     ERROR_PROCESS_FAILED,
@@ -57,6 +58,66 @@ def get_result(
             content={"id": content_id, "detail": "Result file not found."}
         ).asdict()
 
+    # Responses saved by the batch helpers carry the model result and its timing
+    content: Dict[str, Any] = {"id": content_id, "result": str(result_path)}
+    if result_file.suffix == ".json":
+        saved = json.loads(result_file.read_text(encoding="utf-8"))
+        content["result"] = saved.get("content", {}).get("result", saved)
+        if "timing" in saved.get("content", {}):
+            content["timing"] = saved["content"]["timing"]
+
+    return MESSAGE_SUCCESS(content=content).asdict()
+
+
+def get_progress(
+    content_id: str,
+    status_path: str,
+) -> Dict[str, Any]:
+    """
+    Aggregate progress of a job: the status of each of its files.
+
+    A multi-file job lists its items in `<content_id>.items.json`; any other
+    content counts as a job of one item (itself).
+
+    Args:
+        content_id (str): Unique ID of the job.
+        status_path (str): Path to the .status file of the job.
+
+    Returns:
+        Dict[str, Any]: MESSAGE_SUCCESS with "progress" (e.g. "12/40 done"),
+            counts per status and the status of every item.
+    """
+    path = Path(status_path)
+    if not path.exists():
+        return ERROR_PROCESS_FAILED(
+            content={"id": content_id, "detail": "Status file not found."}
+        ).asdict()
+
+    listing = path.with_suffix(".items.json")
+    items = (
+        json.loads(listing.read_text(encoding="utf-8"))
+        if listing.exists()
+        else [{"id": content_id, "file": ""}]
+    )
+
+    counts: Dict[str, int] = {}
+    for item in items:
+        # Items are contents of their own, next to the job
+        item_path = get_status_path(item["id"], str(path.parent.parent))
+        try:
+            status, _ = read_status(item_path)
+            item["status"] = status.value
+        except (OSError, ValueError):
+            item["status"] = Status.FAILED.value
+        counts[item["status"]] = counts.get(item["status"], 0) + 1
+
+    done = counts.get(Status.DONE.value, 0)
     return MESSAGE_SUCCESS(
-        content={"id": content_id, "result": str(result_path)}
+        content={
+            "id": content_id,
+            "progress": f"{done}/{len(items)} done",
+            "total": len(items),
+            "counts": counts,
+            "items": items,
+        }
     ).asdict()
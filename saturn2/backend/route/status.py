@@ -9,6 +9,7 @@ from enum import Enum
 from pathlib import Path
 from typing import Dict, Any, Tuple
 
+from .metrics import observe_status
 from ..code.code import (
     MESSAGE_UPLOAD_SUCCESS,
     MESSAGE_PROCESS_PENDING,
@@ -80,10 +81,14 @@ def check_status(
         status,
         (ERROR_INVALID_TASK, f"File {content_id} has invalid status"),
     )
+    text = template.format(content_id=content_id, detail=detail)
+    # Running jobs report their progress (e.g. "12/40 done") or input file
+    if status == Status.RUNNING and detail:
+        text = f"{text}: {detail}"
     message = handler(
         content={
             "content_id": content_id,
-            "detail": template.format(content_id=content_id, detail=detail),
+            "detail": text,
         }
     )
     return message.asdict()
@@ -105,7 +110,7 @@ def set_status_path(
     """
     if not content_id:
         content_id = uuid.uuid4().hex
-    status_path = Path(out_dir) / content_id / f"{content_id}.status"
+    status_path = Path(get_status_path(content_id, out_dir))
     status_path.parent.mkdir(parents=True, exist_ok=True)
     status_path.write_text(
         '\t'.join([
@@ -116,7 +121,36 @@ def set_status_path(
     return content_id, str(status_path)
 
 
+def get_status_path(
+    content_id: str,
+    out_dir: str,
+)-> str:
+    """Return the status file path of content_id without creating it.
+
+    Args:
+        content_id (str): Unique identifier for the content.
+        out_dir (str): Output directory where the status file was created.
+    Returns:
+        str: Path to the status file.
+    """
+    return str(Path(out_dir) / content_id / f"{content_id}.status")
+
+
+def read_status(status_path: str) -> Tuple[Status, str]:
+    """Read the current status and detail from the status file.
+
+    Raises:
+        FileNotFoundError: If the status file does not exist.
+        ValueError: If the status file is malformed.
+    """
+    raw = Path(status_path).read_text(encoding="utf-8").strip().split("\t", 1)
+    if len(raw) != 2:
+        raise ValueError("Malformed status file.")
+    return Status(raw[0]), raw[1]
+
+
 def update_status(status_path: str, status: Status, detail: Any) -> None:
     """Write the current status and detail to the status file.
     """
-    Path(status_path).write_text(f"{status.value}\t{detail}", encoding='utf-8')
\ No newline at end of file
+    Path(status_path).write_text(f"{status.value}\t{detail}", encoding='utf-8')
+    observe_status(status)
\ No newline at end of file
@@ -4,11 +4,11 @@
 # AUTHORS:
 # Sukbong Kwon (Galois)
 
-import inspect
 from typing import Any, Callable
 from fastapi.responses import JSONResponse
 
 from ..code.code import MESSAGE_SUCCESS, ERROR_PROCESS_FAILED
+from .executor import run_model
 
 async def run_text(
     model: Callable[..., Any],
@@ -22,10 +22,8 @@ async def run_text(
     Always returns a JSONResponse with a standardized success/error schema.
     """
     try:
-        # Invoke the model (await if it's a coroutine, otherwise use directly)
-        raw = model(text, content_id, **kwargs)
-        if inspect.isawaitable(raw):
-            raw = await raw
+        # Invoke the model (await if it's a coroutine, otherwise run in the executor)
+        raw = await run_model(model, text, content_id, **kwargs)
 
         # Build the success payload
         payload = MESSAGE_SUCCESS(
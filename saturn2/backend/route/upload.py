@@ -4,36 +4,136 @@
 # AUTHORS:
 # Sukbong Kwon (Galois)
 
+import asyncio
+import hashlib
 import aiofiles
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, Optional, Sequence
 from fastapi import UploadFile
+from fastapi.responses import JSONResponse
 
 from .status import Status
-from ..code.code import MESSAGE_UPLOAD_SUCCESS
+from .metrics import observe_status, observe_upload
+from ..code.code import MESSAGE_UPLOAD_SUCCESS, ERROR_UPLOAD_FAILED
+from ...media.helper.load_audio import probe_header
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadRejected(ValueError):
+    """An upload refused before it was read to the end (too large, not audio)"""
+
+
+class ContentHash:
+    """SHA-256 of the upload, computed while it is read (for the caches)"""
+    def __init__(self) -> None:
+        self._hash = hashlib.sha256()
+        self.digest = ""
+
+    def feed(self, chunk: bytes) -> None:
+        self._hash.update(chunk)
+
+    def close(self) -> None:
+        self.digest = self._hash.hexdigest()
+
+    def abort(self) -> None:
+        pass
+
+
+class HeaderProbe:
+    """Format check on the first bytes of the upload
+
+    Rejects empty uploads and files that are never audio (documents,
+    images, text such as an HTML error page), and WAV files longer than
+    `max_duration`, as soon as the header has arrived. Unknown formats are
+    left to the decoder.
+    """
+    def __init__(
+        self,
+        max_duration: float = 0.0,
+        header_bytes: int = 4096,
+    )-> None:
+        self.max_duration = max_duration
+        self.header_bytes = header_bytes
+        self.info: Dict[str, Any] = {}
+        self._header = b""
+
+    def feed(self, chunk: bytes) -> None:
+        if self.info:
+            return
+        self._header += chunk
+        if len(self._header) >= self.header_bytes:
+            self._probe()
+
+    def close(self) -> None:
+        if not self.info:
+            self._probe()
+
+    def abort(self) -> None:
+        pass
+
+    def _probe(self) -> None:
+        if not self._header:
+            raise UploadRejected("Empty file")
+        self.info = probe_header(self._header)
+        self._header = b""
+        if self.info["kind"] == "other":
+            raise UploadRejected(f"Not an audio file ({self.info['format']})")
+        duration = self.info.get("duration", 0.0)
+        if self.max_duration and duration > self.max_duration:
+            raise UploadRejected(f"Audio is too long ({duration:.1f}s > {self.max_duration:g}s)")
 
 
 async def upload_file(
     file: UploadFile,
     status_path: str,
     file_path: str,
+    consumers: Sequence[Any] = (),
+    max_bytes: int = 0,
 )-> Dict:
     """
     Save an UploadFile to disk under out_dir/<id>/ and update its status file.
 
+    Every chunk is also fed to the consumers (e.g. `ContentHash`,
+    `HeaderProbe`, `StreamDecoder`) while it is written, so their results
+    are ready when the last chunk is saved. A consumer may stop the upload
+    by raising `UploadRejected`.
+
     Args:
         file (UploadFile): The file to upload.
         status_path (str): The path to the status file.
         file_path (str): The path of the uploaded file.
+        consumers (Sequence): Objects with `feed(chunk)`, `close()` and `abort()`.
+        max_bytes (int): Reject files larger than this (0 for no limit).
     Returns:
         Dict: A dictionary containing the status of the upload.
         (empty dictionary if successful, or an error message if failed)
+    Raises:
+        UploadRejected: If the file is too large or a consumer rejected it.
+        RuntimeError: If the upload fails.
     """
     try:
-        # 비동기로 저장
+        if max_bytes and (file.size or 0) > max_bytes:
+            raise UploadRejected(f"File is too large ({file.size} > {max_bytes} bytes)")
+
+        # 비동기로 저장하면서 같은 청크를 해시/헤더 검사/디코더에 전달
+        size = 0
         async with aiofiles.open(file_path, "wb") as buffer:
-            while chunk := await file.read(1024 * 1024):
-                await buffer.write(chunk)
+            while chunk := await file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadRejected(f"File is too large (> {max_bytes} bytes)")
+                write = asyncio.ensure_future(buffer.write(chunk))
+                try:
+                    for consumer in consumers:
+                        consumer.feed(chunk)
+                finally:
+                    await write
+                observe_upload(len(chunk), "upload")
+
+        # Flush the decoders (ffmpeg exits after the last chunk)
+        for consumer in consumers:
+            await asyncio.to_thread(consumer.close)
 
         # Update the status file
         Path(status_path).write_text(
@@ -42,8 +142,13 @@ async def upload_file(
                 f"File {file.filename} uploaded successfully",
             ])
         )
+        observe_status(Status.UPLOADED)
         return MESSAGE_UPLOAD_SUCCESS(content={"id": file_path}).asdict()
     except Exception as e:
+        for consumer in consumers:
+            consumer.abort()
+        Path(file_path).unlink(missing_ok=True)
+
         # If the upload fails, update the status file with the error message
         Path(status_path).write_text(
             '\t'.join([
@@ -51,6 +156,42 @@ async def upload_file(
                 f"File {file.filename} upload failed: {str(e)}",
             ])
         )
+        observe_status(Status.FAILED)
+        if isinstance(e, UploadRejected):
+            raise
         raise RuntimeError(str(e))
 
 
+class UploadLimitMiddleware:
+    """ASGI middleware rejecting requests whose Content-Length is over the limit
+
+    The request is answered before its body is read, so an oversized
+    upload is not transferred. Bodies without a Content-Length (chunked)
+    are checked by `upload_file` instead.
+    """
+    def __init__(self, app: Any, max_bytes: int = 0) -> None:
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Dict, receive: Any, send: Any) -> None:
+        length = self._content_length(scope) if scope["type"] == "http" else None
+        if self.max_bytes and length is not None and length > self.max_bytes:
+            response = JSONResponse(
+                content=ERROR_UPLOAD_FAILED(
+                    content={"detail": f"Request is too large ({length} > {self.max_bytes} bytes)"}
+                ).asdict(),
+                status_code=413,
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _content_length(scope: Dict) -> Optional[int]:
+        for key, value in scope.get("headers", []):
+            if key == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN2
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of the file content
+
+    Args:
+        path (str): Path to the file
+        chunk_size (int): Read size
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(**fields: Any) -> str:
+    """Key from the content hash and every option that changes the result
+
+    Examples:
+        cache_key(audio=file_sha256("a.wav"), model="tiny", lang="ko", task="transcribe")
+    """
+    return hashlib.sha256(
+        json.dumps(fields, sort_keys=True, default=repr).encode("utf-8")
+    ).hexdigest()
+
+
+class DiskCache:
+    """Content-addressed cache on disk with LRU eviction under a byte budget
+
+    Each entry is a directory `<root>/<key>/` holding `data.json` and the
+    stored files. The modification time of `data.json` is the last access
+    time used for eviction.
+
+    The total size is scanned once and then tracked as entries are stored;
+    the directory is scanned again only when the budget is exceeded, which
+    also picks up entries stored or removed by other workers.
+    """
+    DATA = "data.json"
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = 1024 ** 3,
+        on_event: Optional[Callable[[str], None]] = None,
+    )-> None:
+        """Create the cache directory
+
+        Args:
+            root (str): Cache directory
+            max_bytes (int): Byte budget of all entries
+            on_event (Callable, optional): Called with 'hit', 'miss' or 'eviction'
+                (e.g. to count them as metrics)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.on_event = on_event
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None
+
+    def get(self, key: str) -> Optional[Tuple[Dict, Path]]:
+        """Return the stored data and the entry directory, or None on a miss
+        """
+        entry = self.root / key
+        try:
+            data = json.loads((entry / self.DATA).read_text(encoding="utf-8"))
+            os.utime(entry / self.DATA)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._count("miss")
+            return None
+
+        self._count("hit")
+        return data, entry
+
+    def put(
+        self,
+        key: str,
+        data: Dict,
+        files: Dict[str, str],
+    )-> None:
+        """Store data and files under key, then evict down to the budget
+
+        Args:
+            key (str): Cache key
+            data (Dict): JSON serializable data
+            files (Dict[str, str]): Stored name -> source path
+        """
+        tmp = self.root / f".tmp-{uuid.uuid4().hex}"
+        tmp.mkdir()
+        try:
+            for name, source in files.items():
+                shutil.copyfile(source, tmp / name)
+            (tmp / self.DATA).write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            size = sum(f.stat().st_size for f in tmp.iterdir())
+            os.rename(tmp, self.root / key)
+        except OSError:
+            # Stored by another worker in the meantime
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+
+        with self._lock:
+            if self._total is not None:
+                self._total += size
+            over = self._total is None or self._total > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits the budget
+
+        Scans the cache directory, so `put` calls it only when the tracked
+        total is over the budget.
+        """
+        entries = []
+        total = 0
+        for entry in self.root.iterdir():
+            # Stores in progress, and files that are not entries
+            if entry.name.startswith(".tmp-") or not entry.is_dir():
+                continue
+            try:
+                size = sum(f.stat().st_size for f in entry.iterdir())
+                entries.append(((entry / self.DATA).stat().st_mtime, size, entry))
+            except FileNotFoundError:
+                # Removed by another worker
+                continue
+            total += size
+
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            self._count("eviction")
+
+        with self._lock:
+            self._total = total
+
+    def _count(self, event: str) -> None:
+        with self._lock:
+            if event == "hit":
+                self.hits += 1
+            elif event == "miss":
+                self.misses += 1
+            else:
+                self.evictions += 1
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and eviction counters
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
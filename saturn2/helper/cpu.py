@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN2
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+# CPUs, pinning and torch threads of the calling thread (set by `limit_threads`)
+_local = threading.local()
+
+
+def available_cpus() -> List[int]:
+    """Logical CPUs this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def physical_cores(cpus: List[int]) -> List[List[int]]:
+    """Group logical CPUs by physical core (SMT siblings together)
+
+    Args:
+        cpus (List[int]): Logical CPUs.
+    Returns:
+        List[List[int]]: Sibling CPUs of each physical core, in CPU order.
+    """
+    cores: List[List[int]] = []
+    seen = set()
+    for cpu in cpus:
+        if cpu in seen:
+            continue
+        siblings = [cpu]
+        path = Path(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list")
+        if path.is_file():
+            siblings = [c for c in _parse_cpu_list(path.read_text()) if c in cpus] or [cpu]
+        seen.update(siblings)
+        cores.append(siblings)
+    return cores
+
+
+def partition_cores(
+    slots: int,
+    threads_per_slot: int = 0,
+)-> List[List[int]]:
+    """Split the available CPUs into disjoint sets, one per inference slot
+
+    Physical cores are handed out before their SMT siblings, so slots do not
+    share a core while there are enough of them.
+
+    Args:
+        slots (int): Number of concurrent slots.
+        threads_per_slot (int): CPUs per slot (0 to divide all CPUs evenly).
+    Returns:
+        List[List[int]]: CPUs of each slot.
+    """
+    cores = physical_cores(available_cpus())
+    ordered = [siblings[i] for i in range(max(map(len, cores))) for siblings in cores if i < len(siblings)]
+    slots = max(1, slots)
+    threads = threads_per_slot or max(1, len(ordered) // slots)
+
+    # Slots wrap around when they ask for more CPUs than there are
+    return [
+        sorted({ordered[(slot * threads + i) % len(ordered)] for i in range(threads)})
+        for slot in range(slots)
+    ]
+
+
+def limit_threads(
+    cores: List[int],
+    pin_cores: bool = False,
+    num_threads: int = 0,
+)-> None:
+    """Limit the torch intra-op threads of the calling thread to its CPUs
+
+    The limits are remembered per thread, so threads started for the same
+    work can take them over (see `inherit_limits`).
+
+    Args:
+        cores (List[int]): CPUs of the thread.
+        pin_cores (bool): Set the CPU affinity of the thread to the CPUs.
+        num_threads (int): torch threads (0 for one per CPU).
+    """
+    if pin_cores and hasattr(os, "sched_setaffinity"):
+        # Applies to the calling thread; threads it starts inherit it
+        os.sched_setaffinity(0, cores)
+    try:
+        import torch
+        torch.set_num_threads(num_threads or len(cores))
+    except ImportError:
+        pass
+    _local.limits = (list(cores), pin_cores, num_threads or len(cores))
+
+
+def thread_limits() -> Optional[Tuple[List[int], bool, int]]:
+    """CPUs, pinning and torch threads set by `limit_threads` on the calling thread, if any"""
+    return getattr(_local, "limits", None)
+
+
+def inherit_limits(share: int = 1) -> Callable[[], None]:
+    """Thread initializer giving other threads the limits of the calling thread
+
+    Use it for threads doing part of the work of an inference slot (e.g. a
+    `ThreadPoolExecutor(initializer=inherit_limits(workers))`), so they stay
+    on the CPUs of the slot instead of using every core.
+
+    Args:
+        share (int): Number of threads sharing the CPUs; each gets its part
+            of the torch threads.
+    Returns:
+        Callable: Applies the limits to the thread calling it (no-op when the
+        calling thread had none).
+    """
+    limits = thread_limits()
+
+    def initializer() -> None:
+        if limits is not None:
+            cores, pin_cores, num_threads = limits
+            limit_threads(cores, pin_cores, max(1, num_threads // max(1, share)))
+
+    return initializer
+
+
+def _parse_cpu_list(text: str) -> List[int]:
+    # e.g. "0-3,8-11" or "0,4"
+    cpus: List[int] = []
+    for part in text.strip().split(","):
+        if "-" in part:
+            start, end = part.split("-")
+            cpus.extend(range(int(start), int(end) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN2
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+_current: contextvars.ContextVar[Optional["StageTimer"]] = contextvars.ContextVar("stage_timer", default=None)
+
+
+class StageTimer:
+    """Wall time, CPU time and call count of each stage of a pipeline
+
+    CPU time is the process CPU time spent while the stage ran, so it
+    includes the intra-op threads of torch; CPU time above wall time means
+    parallel work. Stages may nest (e.g. encoder inside decode) and may run
+    on several threads at once; their times are then summed, and each
+    concurrent run also counts the CPU time of the others.
+
+    Examples:
+        with timed() as timer:
+            with stage("load_audio"):
+                audio = load_audio(path)
+        timer.report(audio_duration=30.0)
+    """
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, wall: float, cpu: float) -> None:
+        with self._lock:
+            entry = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0, "count": 0})
+            entry["wall"] += wall
+            entry["cpu"] += cpu
+            entry["count"] += 1
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def report(self, audio_duration: float = 0.0) -> Dict[str, Any]:
+        """Per-stage breakdown, with the real-time factor when the duration is known
+
+        Args:
+            audio_duration (float): Audio duration in seconds.
+        Returns:
+            Dict: {"total": seconds, "rtf": ..., "stages": {name: {"wall", "cpu", "count", "rtf"}}}
+        """
+        total = time.perf_counter() - self.started
+        with self._lock:
+            stages = {
+                name: {
+                    "wall": round(entry["wall"], 4),
+                    "cpu": round(entry["cpu"], 4),
+                    "count": int(entry["count"]),
+                    **({"rtf": round(entry["wall"] / audio_duration, 4)} if audio_duration else {}),
+                }
+                for name, entry in self.stages.items()
+            }
+        report: Dict[str, Any] = {"total": round(total, 4)}
+        if audio_duration:
+            report["rtf"] = round(total / audio_duration, 4)
+        report["stages"] = stages
+        return report
+
+
+def current_timer() -> Optional[StageTimer]:
+    """Timer of the current context, if any"""
+    return _current.get()
+
+
+@contextmanager
+def timed() -> Iterator[StageTimer]:
+    """Start a timer for the current context (threads started with
+    `contextvars.copy_context()` share it)"""
+    timer = StageTimer()
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a stage on the current timer (no-op without one)"""
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+def time_module(module: Any, name: str) -> None:
+    """Time every forward pass of a torch module as a stage of the current timer
+
+    Passes on threads without a timer (e.g. a shared batching thread) are
+    not counted.
+
+    Args:
+        module (torch.nn.Module): Module to time.
+        name (str): Stage name.
+    """
+    local = threading.local()
+
+    def before(module: Any, args: Any) -> None:
+        if _current.get() is not None:
+            local.start = (time.perf_counter(), time.process_time())
+
+    def after(module: Any, args: Any, output: Any) -> None:
+        start = getattr(local, "start", None)
+        timer = _current.get()
+        if start is None or timer is None:
+            return
+        local.start = None
+        timer.add(name, time.perf_counter() - start[0], time.process_time() - start[1])
+
+    module.register_forward_pre_hook(before)
+    module.register_forward_hook(after)
+
+
+@contextmanager
+def profile(kind: str, path: str) -> Iterator[Optional[str]]:
+    """Capture a profiler trace of the block to disk
+
+    Args:
+        kind (str): 'cprofile' (pstats file, `.prof`), 'torch' (chrome trace,
+            `.json`), or '' to disable.
+        path (str): Trace path without suffix.
+    Yields:
+        str: Path of the trace file, or None when disabled.
+    Raises:
+        ValueError: If the kind is unknown.
+    """
+    if not kind:
+        yield None
+        return
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    if kind == "cprofile":
+        import cProfile
+        trace = f"{path}.prof"
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield trace
+        finally:
+            profiler.disable()
+            profiler.dump_stats(trace)
+    elif kind == "torch":
+        import torch
+        trace = f"{path}.json"
+        with torch.profiler.profile(
+            activities=[torch.profiler.ProfilerActivity.CPU],
+            record_shapes=True,
+        ) as profiler:
+            yield trace
+        profiler.export_chrome_trace(trace)
+    else:
+        raise ValueError(f"Unknown profiler: {kind}")
@@ -0,0 +1,459 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+import io
+import re
+import wave
+import queue
+import struct
+import tempfile
+import threading
+import numpy as np
+from dataclasses import asdict
+from subprocess import CalledProcessError, PIPE, Popen, run
+from typing import Any, Dict, List, Optional, Tuple
+from .schema import AudioInfo
+
+# Define
+SAMPLE_RATE = 16000
+
+# Leading bytes of audio containers and streams: (offset, magic, format)
+AUDIO_SIGNATURES = [
+    (0, b"fLaC", "flac"),
+    (0, b"OggS", "ogg"),
+    (0, b"ID3", "mp3"),
+    (4, b"ftyp", "mp4"),
+    (0, b"\x1aE\xdf\xa3", "webm"),
+    (0, b"FORM", "aiff"),
+    (0, b"#!AMR", "amr"),
+    (0, b"caff", "caf"),
+    (0, b"0&\xb2u\x8ef\xcf\x11", "asf"),
+]
+# Files that are never audio
+OTHER_SIGNATURES = [
+    (0, b"%PDF", "pdf"),
+    (0, b"PK\x03\x04", "zip"),
+    (0, b"\x89PNG", "png"),
+    (0, b"\xff\xd8\xff", "jpeg"),
+    (0, b"GIF8", "gif"),
+]
+
+# "Stream #0:0: Audio: flac, 44100 Hz, stereo, s16"
+_STREAM_PATTERN = re.compile(r"Stream #\d+:\d+.*?: Audio: [^,]+, (\d+) Hz, ([^,\n]+)")
+
+
+def load_audio(
+    audio: str,
+    sample_rate: int = SAMPLE_RATE,
+)-> Tuple[np.ndarray, Dict]:
+    """Decode audio once with ffmpeg into a mono float32 array
+
+    The information of the source stream (sample rate, channels) is read
+    from the same ffmpeg run, so no extra probe is needed.
+
+    Args:
+        audio (str): Path to the audio file
+        sample_rate (int): Sample rate of the output array
+    Returns:
+        Tuple[np.ndarray, Dict]: Audio in [-1, 1], and audio information
+    Raises:
+        RuntimeError: If ffmpeg fails to decode the audio
+    """
+    return _ffmpeg(["-i", audio], sample_rate)
+
+
+def decode_audio_bytes(
+    data: bytes,
+    content_type: str = "",
+    sample_rate: int = SAMPLE_RATE,
+)-> Tuple[np.ndarray, Dict]:
+    """Decode audio bytes in memory into a mono float32 array
+
+    Raw 16-bit PCM (`audio/pcm` little-endian, `audio/L16` big-endian, with
+    optional `rate` and `channels` parameters) and 16-bit PCM WAV at the
+    output sample rate are converted directly. Anything else is piped
+    through ffmpeg's stdin.
+
+    Args:
+        data (bytes): Encoded audio
+        content_type (str): Content type of the data, e.g. 'audio/L16; rate=16000'
+        sample_rate (int): Sample rate of the output array
+    Returns:
+        Tuple[np.ndarray, Dict]: Audio in [-1, 1], and audio information
+    Raises:
+        RuntimeError: If the audio cannot be decoded
+    """
+    media_type, params = _parse_content_type(content_type)
+
+    if media_type in ("audio/pcm", "audio/l16"):
+        rate = int(params.get("rate", sample_rate))
+        channels = int(params.get("channels", 1))
+        dtype = ">i2" if media_type == "audio/l16" else "<i2"
+        if rate == sample_rate:
+            return _pcm16_to_float32(data, dtype, channels), asdict(AudioInfo(
+                duration=len(data) // (2 * channels) / rate,
+                sample_rate=rate,
+                channels=channels,
+            ))
+        raw = "s16be" if media_type == "audio/l16" else "s16le"
+        return _ffmpeg(["-f", raw, "-ar", str(rate), "-ac", str(channels), "-i", "pipe:0"], sample_rate, data)
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        decoded = _read_wav(data, sample_rate)
+        if decoded is not None:
+            return decoded
+
+    try:
+        return _ffmpeg(["-i", "pipe:0"], sample_rate, data)
+    except RuntimeError:
+        # Containers with their index at the end (e.g. mp4) need a seekable input
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(data)
+            f.flush()
+            return load_audio(f.name, sample_rate)
+
+
+def probe_header(header: bytes) -> Dict[str, Any]:
+    """Identify the format from the leading bytes of a file
+
+    Args:
+        header (bytes): First bytes of the file (a few KB are enough)
+    Returns:
+        Dict: 'format' and 'kind' ('audio', 'other' for files that are never
+        audio, or 'unknown' to leave it to ffmpeg). WAV headers also give
+        'sample_rate', 'channels', 'sample_width', 'data_offset' and, when
+        the data size is set, 'duration'.
+    """
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return {"format": "wav", "kind": "audio", **_parse_wav_header(header)}
+    for offset, magic, name in AUDIO_SIGNATURES:
+        if header[offset:offset + len(magic)] == magic:
+            return {"format": name, "kind": "audio"}
+    # MPEG audio / ADTS AAC frame sync (11 set bits)
+    if len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0:
+        return {"format": "mpeg", "kind": "audio"}
+    for offset, magic, name in OTHER_SIGNATURES:
+        if header[offset:offset + len(magic)] == magic:
+            return {"format": name, "kind": "other"}
+    if _is_text(header):
+        return {"format": "text", "kind": "other"}
+    return {"format": "", "kind": "unknown"}
+
+
+class StreamDecoder:
+    """Decode audio while its bytes arrive, into a mono float32 array
+
+    16-bit PCM WAV at the output sample rate is converted chunk by chunk.
+    Anything else is piped through an ffmpeg process started with the first
+    chunk. Formats that ffmpeg cannot read from a pipe (e.g. mp4 with its
+    index at the end) give no result, and the caller decodes the saved file.
+
+    Examples:
+        decoder = StreamDecoder()
+        for chunk in chunks:
+            decoder.feed(chunk)
+        decoder.close()
+        audio, audio_info = decoder.result or load_audio(path)
+    """
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        header_bytes: int = 64 * 1024,
+    )-> None:
+        self.sample_rate = sample_rate
+        self.header_bytes = header_bytes
+        self.result: Optional[Tuple[np.ndarray, Dict]] = None
+        self._mode = ""
+        self._buffer = b""
+        # wav: converted samples, bytes of the data chunk left (None: to the end), channels
+        self._samples: List[np.ndarray] = []
+        self._remaining: Optional[int] = None
+        self._channels = 1
+        # ffmpeg: process and its pipe threads
+        self._process: Optional[Popen] = None
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._stdout = b""
+        self._stderr = b""
+
+    def feed(self, chunk: bytes) -> None:
+        """Decode the next chunk of the file"""
+        if self._mode == "wav":
+            self._feed_wav(chunk)
+        elif self._mode == "ffmpeg":
+            self._queue.put(chunk)
+        elif not self._mode:
+            self._buffer += chunk
+            if len(self._buffer) >= self.header_bytes:
+                self._start()
+
+    def close(self) -> None:
+        """Finish decoding after the last chunk (blocks until ffmpeg exits)"""
+        if not self._mode:
+            self._start()
+        if self._mode == "wav":
+            samples = np.concatenate(self._samples) if self._samples else np.zeros(0, np.float32)
+            self.result = samples, asdict(AudioInfo(
+                duration=len(samples) / self.sample_rate,
+                sample_rate=self.sample_rate,
+                channels=self._channels,
+            ))
+        elif self._mode == "ffmpeg":
+            self._queue.put(None)
+            for thread in self._threads:
+                thread.join()
+            if self._process.wait() == 0 and self._stdout:  # type: ignore
+                samples = np.frombuffer(self._stdout, np.int16).astype(np.float32) / 32768.0
+                self.result = samples, parse_audio_info(
+                    self._stderr.decode(errors="ignore"), len(samples) / self.sample_rate,
+                )
+        self._mode = "closed"
+
+    def abort(self) -> None:
+        """Stop decoding (e.g. the upload failed)"""
+        if self._process is not None:
+            self._process.kill()
+            self._queue.put(None)
+            for thread in self._threads:
+                thread.join()
+        self._mode = "closed"
+
+    def _start(self) -> None:
+        """Choose the decoder from the buffered header and feed it the buffer"""
+        header, self._buffer = self._buffer, b""
+        info = probe_header(header)
+        if (
+            info["format"] == "wav"
+            and info.get("audio_format") == 1
+            and info.get("sample_width") == 2
+            and info.get("sample_rate") == self.sample_rate
+            and "data_offset" in info
+        ):
+            self._mode = "wav"
+            self._channels = info["channels"]
+            self._remaining = info.get("data_size")
+            self._feed_wav(header[info["data_offset"]:])
+            return
+
+        try:
+            self._process = Popen(
+                _ffmpeg_command(["-i", "pipe:0"], self.sample_rate, stdin=True),
+                stdin=PIPE, stdout=PIPE, stderr=PIPE,
+            )
+        except OSError:
+            # No ffmpeg: the caller decodes the saved file
+            self._mode = "failed"
+            return
+        self._mode = "ffmpeg"
+        self._threads = [
+            threading.Thread(target=self._write, daemon=True),
+            threading.Thread(target=self._read_stdout, daemon=True),
+            threading.Thread(target=self._read_stderr, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        self._queue.put(header)
+
+    def _feed_wav(self, chunk: bytes) -> None:
+        """Convert whole frames of the data chunk; keep the rest for the next chunk"""
+        if self._remaining is not None:
+            chunk = chunk[:self._remaining]
+            self._remaining -= len(chunk)
+        data = self._buffer + chunk
+        frame = 2 * self._channels
+        usable = len(data) - len(data) % frame
+        if usable:
+            self._samples.append(_pcm16_to_float32(data[:usable], "<i2", self._channels))
+        self._buffer = data[usable:]
+
+    def _write(self) -> None:
+        stdin = self._process.stdin  # type: ignore
+        while (chunk := self._queue.get()) is not None:
+            try:
+                stdin.write(chunk)
+            except (BrokenPipeError, ValueError):
+                # ffmpeg gave up: drop the rest
+                continue
+        try:
+            stdin.close()
+        except BrokenPipeError:
+            pass
+
+    def _read_stdout(self) -> None:
+        self._stdout = self._process.stdout.read()  # type: ignore
+
+    def _read_stderr(self) -> None:
+        self._stderr = self._process.stderr.read()  # type: ignore
+
+
+def _ffmpeg_command(
+    input_args: List[str],
+    sample_rate: int,
+    stdin: bool = False,
+)-> List[str]:
+    """ffmpeg command decoding the input to 16-bit mono PCM on stdout
+    """
+    return [
+        "ffmpeg",
+        *([] if stdin else ["-nostdin"]),
+        "-hide_banner",
+        "-threads", "0",
+        *input_args,
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sample_rate),
+        "-",
+    ]
+
+
+def _ffmpeg(
+    input_args: List[str],
+    sample_rate: int,
+    data: Optional[bytes] = None,
+)-> Tuple[np.ndarray, Dict]:
+    """Run ffmpeg on the input (a file, or data on stdin) to 16-bit mono PCM
+    """
+    cmd = _ffmpeg_command(input_args, sample_rate, stdin=data is not None)
+    try:
+        out = run(cmd, input=data, capture_output=True, check=True)
+    except CalledProcessError as e:
+        raise RuntimeError(f"Failed to load audio: {e.stderr.decode(errors='ignore')}") from e
+
+    samples = np.frombuffer(out.stdout, np.int16).flatten().astype(np.float32) / 32768.0
+    return samples, parse_audio_info(out.stderr.decode(errors="ignore"), len(samples) / sample_rate)
+
+
+def _parse_content_type(content_type: str) -> Tuple[str, Dict[str, str]]:
+    """'audio/L16; rate=16000; channels=1' -> ('audio/l16', {'rate': '16000', 'channels': '1'})
+    """
+    media_type, *parameters = [part.strip() for part in content_type.split(";")]
+    params = {}
+    for parameter in parameters:
+        key, _, value = parameter.partition("=")
+        params[key.strip().lower()] = value.strip().strip('"')
+    return media_type.lower(), params
+
+
+def _pcm16_to_float32(
+    data: bytes,
+    dtype: str,
+    channels: int,
+)-> np.ndarray:
+    """Interleaved 16-bit PCM to mono float32 (channels are averaged like ffmpeg -ac 1)
+    """
+    frames = len(data) // (2 * channels)
+    samples = np.frombuffer(data, dtype, count=frames * channels).astype(np.float32) / 32768.0
+    if channels > 1:
+        samples = samples.reshape(frames, channels).mean(axis=1)
+    return samples
+
+
+def _read_wav(
+    data: bytes,
+    sample_rate: int,
+)-> Optional[Tuple[np.ndarray, Dict]]:
+    """16-bit PCM WAV at the sample rate, or None if ffmpeg must convert it
+    """
+    try:
+        with wave.open(io.BytesIO(data)) as f:
+            if f.getsampwidth() != 2 or f.getframerate() != sample_rate:
+                return None
+            channels = f.getnchannels()
+            frames = f.readframes(f.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    samples = _pcm16_to_float32(frames, "<i2", channels)
+    return samples, asdict(AudioInfo(
+        duration=len(samples) / sample_rate,
+        sample_rate=sample_rate,
+        channels=channels,
+    ))
+
+
+def _parse_wav_header(header: bytes) -> Dict[str, int]:
+    """Format and data chunk of a RIFF/WAVE header (the keys found so far)
+    """
+    info: Dict[str, int] = {}
+    offset = 12
+    while offset + 8 <= len(header):
+        chunk_id, size = header[offset:offset + 4], struct.unpack("<I", header[offset + 4:offset + 8])[0]
+        if chunk_id == b"fmt " and offset + 24 <= len(header):
+            audio_format, channels, rate, _, block_align, bits = struct.unpack(
+                "<HHIIHH", header[offset + 8:offset + 24]
+            )
+            # WAVE_FORMAT_EXTENSIBLE carries the format in its sub-format GUID
+            if audio_format == 0xFFFE and offset + 34 <= len(header):
+                audio_format = struct.unpack("<H", header[offset + 32:offset + 34])[0]
+            info.update(
+                audio_format=audio_format,
+                channels=channels,
+                sample_rate=rate,
+                sample_width=bits // 8,
+                block_align=block_align,
+            )
+        elif chunk_id == b"data":
+            info["data_offset"] = offset + 8
+            # Streaming writers leave the size at 0 or 0xFFFFFFFF
+            if size not in (0, 0xFFFFFFFF):
+                info["data_size"] = size
+                if info.get("block_align") and info.get("sample_rate"):
+                    info["duration"] = size / info["block_align"] / info["sample_rate"]
+            break
+        offset += 8 + size + size % 2
+    return info
+
+
+def _is_text(header: bytes) -> bool:
+    """Whether the bytes read as text (e.g. an HTML error page or JSON)
+    """
+    sample = header[:512]
+    try:
+        text = sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character may be cut at the end
+        if e.start < len(sample) - 3:
+            return False
+        text = sample[:e.start].decode("utf-8")
+    return bool(text) and all(char.isprintable() or char in "\r\n\t" for char in text)
+
+
+def parse_audio_info(
+    log: str,
+    duration: float,
+)-> Dict:
+    """Get audio information from the ffmpeg log of the input stream
+
+    Args:
+        log (str): ffmpeg stderr
+        duration (float): Duration of the decoded audio in seconds
+    Returns:
+        Dict: Dictionary containing audio information
+    """
+    match = _STREAM_PATTERN.search(log)
+    if match is None:
+        return asdict(AudioInfo(duration=duration))
+
+    return asdict(AudioInfo(
+        duration=duration,
+        sample_rate=int(match.group(1)),
+        channels=_channels(match.group(2).strip()),
+    ))
+
+
+def _channels(layout: str) -> int:
+    """Number of channels from an ffmpeg channel layout (mono, stereo, 5.1(side), 3 channels)
+    """
+    if layout.startswith("mono"):
+        return 1
+    if layout.startswith("stereo"):
+        return 2
+    if match := re.match(r"(\d+) channels", layout):
+        return int(match.group(1))
+    if match := re.match(r"(\d+)\.(\d+)", layout):
+        return int(match.group(1)) + int(match.group(2))
+    return 0
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# encoding: utf-8
+# Copyright (c) 2025- SATURN
+# AUTHORS:
+# Sukbong Kwon (Galois)
+
+# Energy-based voice activity detection
+
+import numpy as np
+from typing import List, Tuple
+
+# Define
+SAMPLE_RATE = 16000
+
+
+def detect_speech(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    frame_ms: int = 30,
+    threshold_db: float = -35.0,
+    min_silence_ms: int = 500,
+    min_speech_ms: int = 250,
+    pad_ms: int = 200,
+)-> List[Tuple[int, int]]:
+    """Find speech regions from the frame energy
+
+    A frame is speech when its energy is within `threshold_db` of the
+    loudest frame. Gaps shorter than `min_silence_ms` are merged and
+    regions shorter than `min_speech_ms` are dropped.
+
+    Args:
+        audio (np.ndarray): Mono float32 audio
+        sample_rate (int): Sample rate of the audio
+        frame_ms (int): Frame length in milliseconds
+        threshold_db (float): Threshold relative to the loudest frame
+        min_silence_ms (int): Minimum silence between two regions
+        min_speech_ms (int): Minimum length of a region
+        pad_ms (int): Padding added to both sides of a region
+    Returns:
+        List[Tuple[int, int]]: (start, end) sample indices of speech regions
+    """
+    frame = sample_rate * frame_ms // 1000
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return []
+
+    frames = audio[:n_frames * frame].reshape(n_frames, frame)
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    speech = energy_db > energy_db.max() + threshold_db
+
+    # Frame runs of speech
+    regions: List[List[int]] = []
+    for i in np.flatnonzero(speech):
+        if regions and (i - regions[-1][1]) * frame_ms < min_silence_ms:
+            regions[-1][1] = i + 1
+        else:
+            regions.append([i, i + 1])
+
+    pad = sample_rate * pad_ms // 1000
+    return [
+        (max(0, start * frame - pad), min(len(audio), end * frame + pad))
+        for start, end in regions
+        if (end - start) * frame_ms >= min_speech_ms
+    ]
+
+
+def split_on_silence(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    max_chunk_s: float = 30.0,
+    **kwargs,
+)-> List[Tuple[int, int]]:
+    """Split audio into independent chunks at silences
+
+    Speech regions are packed into chunks of at most `max_chunk_s`.
+    Regions longer than that are cut into pieces of `max_chunk_s`.
+
+    Args:
+        audio (np.ndarray): Mono float32 audio
+        sample_rate (int): Sample rate of the audio
+        max_chunk_s (float): Maximum chunk length in seconds
+        **kwargs: Additional arguments for `detect_speech`
+    Returns:
+        List[Tuple[int, int]]: (start, end) sample indices of chunks
+    """
+    max_len = int(max_chunk_s * sample_rate)
+
+    pieces: List[Tuple[int, int]] = []
+    for start, end in detect_speech(audio, sample_rate, **kwargs):
+        for s in range(start, end, max_len):
+            pieces.append((s, min(end, s + max_len)))
+
+    chunks: List[Tuple[int, int]] = []
+    for start, end in pieces:
+        if chunks and end - chunks[-1][0] <= max_len:
+            chunks[-1] = (chunks[-1][0], end)
+        else:
+            chunks.append((start, end))
+    return chunks